@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import sys
+import argparse
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+
+import joblib
+import numpy as np
+from flask import Flask, Response, jsonify, request
+from waitress import serve
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from api.pool import ConnectionPool, PoolExhausted
+from database.queries import ANALYTICS_QUERIES, TIME_FILTERS, analytics_query
+from database.partitions import PARTITIONING_ENABLED, PARTITIONED_QUERIES, partitioned_analytics
+from database.snapshot import AnalyticsConnection
+from utils.cache import TTLCache
+
+DB_PATH = os.environ.get('EVTOL_DB_PATH', 'data/evtol_operations.db')
+POOL_SIZE = int(os.environ.get('EVTOL_API_POOL_SIZE', '8'))
+CACHE_TTL = float(os.environ.get('EVTOL_API_CACHE_TTL', '5'))  # seconds
+MODELS_DIR = os.environ.get('EVTOL_MODELS_DIR', 'models')
+
+RISK_LEVELS = ['Low', 'Medium', 'High']
+RISK_FEATURES = ['condition', 'temperature', 'wind_speed', 'vehicle_count', 'average_speed']
+MAX_BATCH_SIZE = 10000
+
+app = Flask(__name__)
+pool = ConnectionPool(DB_PATH, size=POOL_SIZE)
+response_cache = TTLCache(ttl=CACHE_TTL, max_entries=1024)
+safety_models = {}
+
+def query_rows(sql, params=()):
+    with pool.connection() as conn:
+        cursor = conn.execute(sql, params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def cached_json(view):
+    """Serve a view's JSON from the TTL cache with an ETag.
+
+    The cache key is the full request path including the query string.
+    Clients sending a matching If-None-Match get 304 without a body.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.full_path
+        entry = response_cache.get(key)
+        if entry is None:
+            result = view(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+            body = json.dumps(result, default=str).encode('utf-8')
+            entry = (body, hashlib.sha1(body).hexdigest())
+            response_cache.set(key, entry)
+
+        body, etag = entry
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.cache_control.max_age = int(CACHE_TTL)
+        return response
+    return wrapper
+
+def error(message, status=400):
+    response = jsonify({"error": message})
+    response.status_code = status
+    return response
+
+@app.errorhandler(PoolExhausted)
+def pool_exhausted(e):
+    # Every connection is busy: ask clients to back off instead of failing with 500
+    response = error(str(e), 503)
+    response.headers['Retry-After'] = '1'
+    return response
+
+def load_safety_models():
+    # Loaded once per process, like load_models() in the dashboard
+    if not safety_models:
+        safety_models['model'] = joblib.load(Path(MODELS_DIR) / 'safety_model.joblib')
+        safety_models['scaler'] = joblib.load(Path(MODELS_DIR) / 'safety_scaler.joblib')
+        safety_models['label_encoder'] = joblib.load(Path(MODELS_DIR) / 'safety_label_encoder.joblib')
+    return safety_models
+
+@app.get('/api/health')
+def health():
+    return jsonify({"status": "ok"})
+
+@app.get('/api/flights/active')
+@cached_json
+def active_flights():
+    return query_rows("""
+        SELECT flight_id, origin, destination, path, energy_consumption, status, created_at
+        FROM flights
+        WHERE status='In Progress'
+        ORDER BY created_at DESC
+    """)
+
+@app.get('/api/fleet/kpis')
+@cached_json
+def fleet_kpis():
+    queries = {
+        "active_flights": "SELECT COUNT(*) FROM flights WHERE status='In Progress'",
+        "fleet_size": "SELECT COUNT(*) FROM evtols",
+        "critical_maintenance": "SELECT COUNT(*) FROM evtols WHERE maintenance_status='Critical'",
+        "maintenance_required": "SELECT COUNT(*) FROM evtols WHERE maintenance_status!='OK'",
+        "avg_battery": "SELECT AVG(battery_status) FROM evtols",
+        "airspace_conflicts": "SELECT COUNT(*) FROM conflicts",
+        "open_alerts": "SELECT COUNT(*) FROM alerts WHERE resolved_at IS NULL"
+    }
+    # Small indexed counts: one pooled connection for all of them
+    with pool.connection() as conn:
+        return {name: conn.execute(sql).fetchone()[0] for name, sql in queries.items()}
+
+@app.get('/api/fleet')
+@cached_json
+def fleet_status():
+    return query_rows("""
+        SELECT id, model_type, battery_status, maintenance_status,
+               usage_count, last_maintenance, max_range
+        FROM evtols
+        ORDER BY id
+    """)
+
+@app.get('/api/alerts')
+@cached_json
+def open_alerts():
+    return query_rows("""
+        SELECT flight_id, zone, condition, risk_level, observed_at, created_at
+        FROM alerts
+        WHERE resolved_at IS NULL
+        ORDER BY created_at DESC
+    """)
+
+@app.get('/api/analytics/<name>')
+@cached_json
+def analytics(name):
+    time_range = request.args.get('time_range', 'All Time')
+    if name not in ANALYTICS_QUERIES:
+        return error(f"Unknown analytics query: {name}", 404)
+    if time_range not in TIME_FILTERS:
+        return error(f"Unknown time range: {time_range}")
+
+    # Partitions are read live; other aggregates come from the analytics
+    # snapshot when it is enabled, like the dashboard, so report how old they are
+    if PARTITIONING_ENABLED and name in PARTITIONED_QUERIES:
+        return {"as_of": datetime.now().isoformat(timespec='seconds'),
+                "rows": partitioned_analytics(name, time_range)}
+    analytics_db = AnalyticsConnection(DB_PATH)
+    with analytics_db as conn:
+        cursor = conn.execute(analytics_query(name, time_range))
+        columns = [column[0] for column in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    return {"as_of": analytics_db.as_of.isoformat(timespec='seconds'), "rows": rows}
+
+def valid_observation(obs):
+    # Checked up front so malformed input is a 400, not an error deep in numpy
+    if not isinstance(obs, dict) or not isinstance(obs.get('condition'), str):
+        return False
+    return all(
+        isinstance(obs.get(feature), (int, float)) and not isinstance(obs.get(feature), bool)
+        for feature in RISK_FEATURES[1:]
+    )
+
+def score_observations(observations):
+    models = load_safety_models()
+    conditions = models['label_encoder'].transform([obs['condition'] for obs in observations])
+    features = np.column_stack([
+        conditions,
+        np.array([[float(obs[feature]) for feature in RISK_FEATURES[1:]] for obs in observations])
+    ])
+    probabilities = models['model'].predict_proba(models['scaler'].transform(features))
+    return [
+        {
+            "risk_level": RISK_LEVELS[int(proba.argmax())],
+            "probabilities": dict(zip(RISK_LEVELS, proba.round(4).tolist()))
+        }
+        for proba in probabilities
+    ]
+
+@app.post('/api/risk/score')
+def risk_score():
+    payload = request.get_json(silent=True)
+    observations = payload.get('observations') if isinstance(payload, dict) else None
+    if not isinstance(observations, list) or not observations:
+        return error("Expected a JSON object with a non-empty 'observations' list")
+    if len(observations) > MAX_BATCH_SIZE:
+        return error(f"At most {MAX_BATCH_SIZE} observations per request")
+    invalid = [i for i, obs in enumerate(observations) if not valid_observation(obs)]
+    if invalid:
+        return error(f"Observations {invalid[:10]} must provide a text condition and numeric "
+                     f"{', '.join(RISK_FEATURES[1:])}")
+
+    try:
+        scores = score_observations(observations)
+    except FileNotFoundError:
+        return error("Safety models not trained; run src/models/train_safety_model.py", 503)
+    except (TypeError, ValueError) as e:
+        return error(f"Invalid observation: {str(e)}")
+    return jsonify({"scores": scores})
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="eVTOL operations REST API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=POOL_SIZE,
+                        help="Request threads (default: one per pooled connection)")
+    args = parser.parse_args()
+
+    # Production WSGI server: a fixed pool of request threads over synchronous
+    # views; SQLite and numpy release the GIL while they work
+    serve(app, host=args.host, port=args.port, threads=args.threads)
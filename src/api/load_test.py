@@ -0,0 +1,105 @@
+import argparse
+import http.client
+import json
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+import numpy as np
+
+DEFAULT_PATHS = [
+    '/api/flights/active',
+    '/api/fleet/kpis',
+    '/api/analytics/flight_stats?time_range=Last+Week'
+]
+
+SAMPLE_OBSERVATION = {
+    "condition": "Rain",
+    "temperature": 12.0,
+    "wind_speed": 35.0,
+    "vehicle_count": 20,
+    "average_speed": 90.0
+}
+
+def worker(base_url, paths, deadline, use_etag, score_batch, results):
+    # One keep-alive connection per simulated client
+    url = urlsplit(base_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+    etags = {}
+    latencies, statuses = [], Counter()
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            if path == '/api/risk/score':
+                body = json.dumps({"observations": [SAMPLE_OBSERVATION] * score_batch})
+                conn.request('POST', path, body, {'Content-Type': 'application/json'})
+            else:
+                headers = {'If-None-Match': etags[path]} if use_etag and path in etags else {}
+                conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.getheader('ETag'):
+                etags[path] = response.getheader('ETag')
+            statuses[response.status] += 1
+        except (OSError, http.client.HTTPException):
+            statuses['error'] += 1
+            conn.close()
+            continue
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+    results.append((latencies, statuses))
+
+def run_load_test(base_url='http://127.0.0.1:5000', paths=DEFAULT_PATHS, concurrency=64,
+                  duration=10, use_etag=True, score_batch=100):
+    results = []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=worker, args=(base_url, paths, deadline, use_etag, score_batch, results))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([latency for worker_latencies, _ in results for latency in worker_latencies])
+    statuses = sum((worker_statuses for _, worker_statuses in results), Counter())
+    report = {
+        "concurrency": concurrency,
+        "duration_s": elapsed,
+        "requests": int(len(latencies)),
+        "requests_per_s": len(latencies) / elapsed,
+        "statuses": {str(status): count for status, count in statuses.items()}
+    }
+    if len(latencies):
+        report.update({
+            "latency_ms_p50": float(np.percentile(latencies, 50) * 1000),
+            "latency_ms_p95": float(np.percentile(latencies, 95) * 1000),
+            "latency_ms_p99": float(np.percentile(latencies, 99) * 1000)
+        })
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local load test for the eVTOL REST API")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS,
+                        help="Endpoints to cycle through (/api/risk/score is sent as a batch POST)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per concurrency level")
+    parser.add_argument("--no-etag", action="store_true", help="Do not send If-None-Match")
+    parser.add_argument("--score-batch", type=int, default=100, help="Observations per scoring request")
+    args = parser.parse_args()
+
+    print(f"{'clients':>8} {'req/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for concurrency in args.concurrency:
+        report = run_load_test(args.url, args.paths, concurrency, args.duration,
+                               not args.no_etag, args.score_batch)
+        print(f"{concurrency:>8} {report['requests_per_s']:>10.1f} "
+              f"{report.get('latency_ms_p50', 0):>8.2f} {report.get('latency_ms_p95', 0):>8.2f} "
+              f"{report.get('latency_ms_p99', 0):>8.2f}  {report['statuses']}")
@@ -0,0 +1,80 @@
+import sqlite3
+import queue
+import threading
+from contextlib import contextmanager
+
+class PoolExhausted(Exception):
+    """No connection was returned to the pool within its timeout."""
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared between request threads.
+
+    Connections are opened lazily up to `size`; callers beyond that wait
+    for one to be returned and get PoolExhausted after `timeout` seconds.
+    With `read_only`, connections refuse writes.
+    """
+
+    def __init__(self, db_path='data/evtol_operations.db', size=8, read_only=True, timeout=10):
+        self.db_path = db_path
+        self.size = size
+        self.read_only = read_only
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.opened = 0
+        self.lock = threading.Lock()
+
+    def open_connection(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.timeout)
+        if self.read_only:
+            conn.execute("PRAGMA query_only=1")
+        return conn
+
+    def acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self.lock:
+            can_open = self.opened < self.size
+            if can_open:
+                self.opened += 1
+        if can_open:
+            try:
+                return self.open_connection()
+            except BaseException:
+                # Give the slot back, or failed connects would shrink the pool for good
+                with self.lock:
+                    self.opened -= 1
+                raise
+        try:
+            return self.idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolExhausted(f"No database connection available within {self.timeout}s") from None
+
+    def release(self, conn):
+        self.idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        except sqlite3.Error:
+            # Do not hand a connection in an unknown state to the next request
+            conn.close()
+            with self.lock:
+                self.opened -= 1
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,243 @@
+import sqlite3
+import os
+import re
+import sys
+import zlib
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from database.setup_database import WEATHER_TABLE, TRAFFIC_TABLE
+from database.queries import PARTITIONED_QUERIES, TIME_FILTERS
+
+# Zone partitioning settings, overridable through the environment
+PARTITIONING_ENABLED = os.environ.get('EVTOL_PARTITIONED', '0') == '1'
+PARTITION_DIR = os.environ.get('EVTOL_PARTITION_DIR', 'data/partitions')
+PARTITION_WORKERS = int(os.environ.get('EVTOL_PARTITION_WORKERS', str(os.cpu_count() or 1)))
+PARTITION_PROCESSES = os.environ.get('EVTOL_PARTITION_PROCESSES', '0') == '1'
+
+# Partitioned tables, their partition key and the indices each partition gets
+PARTITIONED_TABLES = {
+    'weather': {
+        'key': 'location',
+        'schema': WEATHER_TABLE,
+        'indices': ['CREATE INDEX IF NOT EXISTS idx_weather_time ON weather(time)']
+    },
+    'traffic': {
+        'key': 'route',
+        'schema': TRAFFIC_TABLE,
+        'indices': ['CREATE INDEX IF NOT EXISTS idx_traffic_timestamp ON traffic(timestamp)']
+    }
+}
+
+AGGREGATES = {'count', 'sum', 'avg', 'min', 'max'}
+
+def partition_path(table, key, partition_dir=PARTITION_DIR):
+    name = re.sub(r'[^A-Za-z0-9_-]', '_', key)
+    if name != key:
+        # Keep keys that only differ in special characters apart
+        name = f"{name}_{zlib.crc32(key.encode()):08x}"
+    return Path(partition_dir) / table / f"{name}.db"
+
+def list_partitions(table, partition_dir=PARTITION_DIR):
+    return sorted((Path(partition_dir) / table).glob('*.db'))
+
+def open_partition(table, key, partition_dir=PARTITION_DIR):
+    path = partition_path(table, key, partition_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute(PARTITIONED_TABLES[table]['schema'])
+    for index in PARTITIONED_TABLES[table]['indices']:
+        conn.execute(index)
+    return conn
+
+# Routes writes for the time-series tables to the partition of their zone or route
+class PartitionRouter:
+    def __init__(self, partition_dir=PARTITION_DIR):
+        self.partition_dir = partition_dir
+        self.connections = {}
+
+    def connection(self, table, key):
+        if (table, key) not in self.connections:
+            self.connections[(table, key)] = open_partition(table, key, self.partition_dir)
+        return self.connections[(table, key)]
+
+    def insert(self, table, rows):
+        # rows are dicts of column -> value; one transaction per partition
+        key_column = PARTITIONED_TABLES[table]['key']
+        by_key = defaultdict(list)
+        for row in rows:
+            by_key[row[key_column]].append(row)
+
+        for key, key_rows in by_key.items():
+            conn = self.connection(table, key)
+            columns = list(key_rows[0])
+            conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                [tuple(row[column] for column in columns) for row in key_rows]
+            )
+            conn.commit()
+        return sum(len(key_rows) for key_rows in by_key.values())
+
+    def close(self):
+        for conn in self.connections.values():
+            conn.close()
+        self.connections = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+def build_partial_query(table, group_by, metrics, where=None):
+    # Each partition returns mergeable partials: averages travel as sum and count
+    columns = [f"{expr} AS {alias}" for alias, expr in group_by.items()]
+    for alias, (func, column) in metrics.items():
+        if func not in AGGREGATES:
+            raise ValueError(f"Unsupported aggregate: {func}")
+        if func == 'avg':
+            columns.append(f"SUM({column}) AS {alias}__sum")
+            columns.append(f"COUNT({column}) AS {alias}__count")
+        else:
+            columns.append(f"{func.upper()}({column}) AS {alias}")
+
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    if where:
+        sql += f" WHERE {where}"
+    if group_by:
+        sql += f" GROUP BY {', '.join(group_by)}"
+    return sql
+
+def partial_aggregate(path, sql, params=()):
+    # Module level so it can also run in a process pool
+    conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+def merge_partials(partials, group_by, metrics):
+    n_groups = len(group_by)
+    merged = {}
+    for rows in partials:
+        for row in rows:
+            key = row[:n_groups]
+            values = row[n_groups:]
+            if key not in merged:
+                merged[key] = list(values)
+                continue
+
+            current = merged[key]
+            position = 0
+            for func, _ in metrics.values():
+                width = 2 if func == 'avg' else 1
+                for offset in range(width):
+                    a, b = current[position + offset], values[position + offset]
+                    if a is None or b is None:
+                        current[position + offset] = b if a is None else a
+                    elif func == 'min':
+                        current[position + offset] = min(a, b)
+                    elif func == 'max':
+                        current[position + offset] = max(a, b)
+                    else:
+                        current[position + offset] = a + b
+                position += width
+
+    results = []
+    for key in sorted(merged, key=lambda k: tuple((v is None, v) for v in k)):
+        row = dict(zip(group_by, key))
+        values = merged[key]
+        position = 0
+        for alias, (func, _) in metrics.items():
+            if func == 'avg':
+                total, count = values[position], values[position + 1]
+                row[alias] = total / count if count else None
+                position += 2
+            else:
+                row[alias] = values[position]
+                position += 1
+        results.append(row)
+    return results
+
+def fan_out_aggregate(table, group_by, metrics, where=None, params=(),
+                      partition_dir=PARTITION_DIR, workers=PARTITION_WORKERS,
+                      use_processes=PARTITION_PROCESSES):
+    """Run a grouped aggregate on every partition in parallel and merge the results.
+
+    `group_by` maps output columns to SQL expressions and `metrics` maps
+    output columns to (function, column) pairs. Returns a list of dicts
+    sorted by the group columns.
+    """
+    sql = build_partial_query(table, group_by, metrics, where)
+    paths = list_partitions(table, partition_dir)
+    if not paths:
+        return []
+
+    # sqlite3 releases the GIL while a query runs, so threads scale across
+    # cores; processes also parallelise converting large partial results
+    pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with pool(max_workers=max(1, min(workers, len(paths)))) as executor:
+        partials = list(executor.map(partial_aggregate, paths, [sql] * len(paths),
+                                     [params] * len(paths)))
+    return merge_partials(partials, group_by, metrics)
+
+def partitioned_analytics(name, time_range="All Time", partition_dir=PARTITION_DIR,
+                          workers=PARTITION_WORKERS):
+    spec = PARTITIONED_QUERIES[name]
+    where = spec.get('where')
+    if where:
+        where = where.format(since=TIME_FILTERS[time_range])
+    return fan_out_aggregate(spec['table'], spec['group_by'], spec['metrics'], where,
+                             partition_dir=partition_dir, workers=workers)
+
+def partitioned_columns(name):
+    spec = PARTITIONED_QUERIES[name]
+    return list(spec['group_by']) + list(spec['metrics'])
+
+def migrate_to_partitions(db_path='data/evtol_operations.db', partition_dir=PARTITION_DIR,
+                          chunk_size=10000):
+    # Copy the time-series tables from the main database into their partitions
+    conn = sqlite3.connect(db_path)
+    try:
+        with PartitionRouter(partition_dir) as router:
+            for table in PARTITIONED_TABLES:
+                if list_partitions(table, partition_dir):
+                    print(f"Partitions for {table} already exist, skipping")
+                    continue
+                cursor = conn.execute(f"SELECT * FROM {table} ORDER BY id")
+                columns = [column[0] for column in cursor.description if column[0] != 'id']
+                id_index = [column[0] for column in cursor.description].index('id')
+                copied = 0
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    copied += router.insert(table, [
+                        {column: value for column, value in zip(columns, row[:id_index] + row[id_index + 1:])}
+                        for row in rows
+                    ])
+                print(f"Copied {copied} {table} rows into {len(list_partitions(table, partition_dir))} partitions")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Zone-partitioned storage for weather and traffic data")
+    parser.add_argument("--partition-dir", default=PARTITION_DIR)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Copy weather and traffic rows into partitions")
+    migrate_parser.add_argument("--db", default="data/evtol_operations.db")
+
+    query_parser = subparsers.add_parser("query", help="Run a fan-out analytics query")
+    query_parser.add_argument("query", choices=list(PARTITIONED_QUERIES))
+    query_parser.add_argument("--time-range", default="All Time", choices=list(TIME_FILTERS))
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrate_to_partitions(args.db, args.partition_dir)
+    else:
+        for row in partitioned_analytics(args.query, args.time_range, args.partition_dir):
+            print(row)
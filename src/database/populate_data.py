@@ -1,7 +1,12 @@
 import sqlite3
 import random
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from database.partitions import PartitionRouter, PARTITIONING_ENABLED
 
 def populate_database():
     conn = sqlite3.connect('data/evtol_operations.db')
@@ -30,42 +35,67 @@ def populate_database():
     conditions = ['Clear', 'Rain', 'Snow', 'Fog', 'Storm']
     risk_levels = ['Low', 'Medium', 'High']
     
+    # Time series are stored in UTC like their CURRENT_TIMESTAMP defaults
+    utc_now = datetime.now(timezone.utc).replace(tzinfo=None)
+    weather_rows = []
     for i in range(100):
-        time = datetime.now() - timedelta(hours=random.randint(0, 72))
-        cursor.execute('''
-            INSERT INTO weather (time, location, condition, risk_level, 
-                               temperature, wind_speed)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            time,
-            random.choice(locations),
-            random.choice(conditions),
-            random.choice(risk_levels),
-            random.uniform(-5, 35),  # temperature
-            random.uniform(0, 50)  # wind_speed
-        ))
+        weather_rows.append({
+            'time': utc_now - timedelta(hours=random.randint(0, 72)),
+            'location': random.choice(locations),
+            'condition': random.choice(conditions),
+            'risk_level': random.choice(risk_levels),
+            'temperature': random.uniform(-5, 35),
+            'wind_speed': random.uniform(0, 50)
+        })
     
     # Sample traffic data
     routes = ['Route1', 'Route2', 'Route3', 'Route4']
     congestion_levels = ['Low', 'Medium', 'High']
     
+    traffic_rows = []
     for i in range(200):
-        time = datetime.now() - timedelta(hours=random.randint(0, 72))
-        cursor.execute('''
+        traffic_rows.append({
+            'route': random.choice(routes),
+            'congestion_level': random.choice(congestion_levels),
+            'timestamp': utc_now - timedelta(hours=random.randint(0, 72)),
+            'vehicle_count': random.randint(5, 50),
+            'average_speed': random.uniform(30, 200)
+        })
+    
+    # Time-series rows go to their zone/route partition when partitioning is enabled
+    if PARTITIONING_ENABLED:
+        with PartitionRouter() as router:
+            router.insert('weather', weather_rows)
+            router.insert('traffic', traffic_rows)
+    else:
+        cursor.executemany('''
+            INSERT INTO weather (time, location, condition, risk_level,
+                               temperature, wind_speed)
+            VALUES (:time, :location, :condition, :risk_level, :temperature, :wind_speed)
+        ''', weather_rows)
+        cursor.executemany('''
             INSERT INTO traffic (route, congestion_level, timestamp,
                                vehicle_count, average_speed)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            random.choice(routes),
-            random.choice(congestion_levels),
-            time,
-            random.randint(5, 50),  # vehicle_count
-            random.uniform(30, 200)  # average_speed
-        ))
+            VALUES (:route, :congestion_level, :timestamp, :vehicle_count, :average_speed)
+        ''', traffic_rows)
     
     # Sample flights data
     origins = ['Heliport-A', 'Heliport-B', 'Heliport-C']
     destinations = ['Vertiport-X', 'Vertiport-Y', 'Vertiport-Z']
+    
+    # Weather zone of each port, used by the alert engine
+    port_zones = {
+        'Heliport-A': 'Zone-A',
+        'Heliport-B': 'Zone-B',
+        'Heliport-C': 'Zone-C',
+        'Vertiport-X': 'Zone-D',
+        'Vertiport-Y': 'Zone-A',
+        'Vertiport-Z': 'Zone-B'
+    }
+    cursor.executemany(
+        "INSERT OR REPLACE INTO port_zones (port, zone) VALUES (?, ?)",
+        port_zones.items()
+    )
     statuses = ['Scheduled', 'In Progress', 'Completed']
     
     for i in range(50):
@@ -79,7 +109,7 @@ def populate_database():
             flight_id,
             random.choice(origins),
             random.choice(destinations),
-            f"[{random.uniform(-74, -73)}, {random.uniform(40, 41)}]",  # sample path coordinates
+            f"[{random.uniform(40, 41)}, {random.uniform(-74, -73)}]",  # sample position as [lat, lon]
             random.uniform(50, 150),  # energy_consumption
             random.choice(statuses),
             created_at
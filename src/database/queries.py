@@ -0,0 +1,90 @@
+# Analytics queries shared by the dashboard and the export/report tools
+
+TIME_FILTERS = {
+    "Last 24 Hours": "datetime('now', '-1 day')",
+    "Last Week": "datetime('now', '-7 days')",
+    "Last Month": "datetime('now', '-30 days')",
+    "All Time": "datetime('now', '-100 years')"  # Effectively all time
+}
+
+ANALYTICS_QUERIES = {
+    "flight_stats": """
+        SELECT status, COUNT(*) as count
+        FROM flights
+        WHERE created_at >= {since}
+        GROUP BY status
+    """,
+    "energy_trends": """
+        SELECT DATE(created_at) as date,
+               AVG(energy_consumption) as avg_energy
+        FROM flights
+        WHERE created_at >= {since}
+        GROUP BY DATE(created_at)
+        ORDER BY date
+    """,
+    "hourly_traffic": """
+        SELECT strftime('%H', timestamp) as hour,
+               route,
+               AVG(vehicle_count) as avg_vehicles
+        FROM traffic
+        WHERE timestamp >= {since}
+        GROUP BY hour, route
+    """,
+    "safety_trends": """
+        SELECT DATE(time) as date,
+               risk_level,
+               COUNT(*) as count
+        FROM weather
+        WHERE time >= {since}
+        GROUP BY date, risk_level
+        ORDER BY date
+    """,
+    "traffic_density": """
+        SELECT route, congestion_level, COUNT(*) as count
+        FROM traffic
+        GROUP BY route, congestion_level
+    """,
+    "risk_distribution": """
+        SELECT risk_level, COUNT(*) as count
+        FROM weather
+        GROUP BY risk_level
+    """,
+    "maintenance_analysis": """
+        SELECT model_type,
+               AVG(usage_count) as avg_usage,
+               COUNT(*) as total_vehicles,
+               SUM(CASE WHEN maintenance_status != 'OK' THEN 1 ELSE 0 END) as maintenance_needed
+        FROM evtols
+        GROUP BY model_type
+    """
+}
+
+# The same queries expressed as mergeable aggregates over the zone
+# partitions: output column -> (function, column) with count, sum, avg, min, max
+PARTITIONED_QUERIES = {
+    "hourly_traffic": {
+        "table": "traffic",
+        "group_by": {"hour": "strftime('%H', timestamp)", "route": "route"},
+        "metrics": {"avg_vehicles": ("avg", "vehicle_count")},
+        "where": "timestamp >= {since}"
+    },
+    "safety_trends": {
+        "table": "weather",
+        "group_by": {"date": "DATE(time)", "risk_level": "risk_level"},
+        "metrics": {"count": ("count", "*")},
+        "where": "time >= {since}"
+    },
+    "traffic_density": {
+        "table": "traffic",
+        "group_by": {"route": "route", "congestion_level": "congestion_level"},
+        "metrics": {"count": ("count", "*")}
+    },
+    "risk_distribution": {
+        "table": "weather",
+        "group_by": {"risk_level": "risk_level"},
+        "metrics": {"count": ("count", "*")}
+    }
+}
+
+def analytics_query(name, time_range="All Time"):
+    return ANALYTICS_QUERIES[name].format(since=TIME_FILTERS[time_range])
@@ -2,6 +2,30 @@ import sqlite3
 import os
 from pathlib import Path
 
+# Time-series tables, shared with the zone partitions in partitions.py
+WEATHER_TABLE = '''
+CREATE TABLE IF NOT EXISTS weather (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    location TEXT NOT NULL,
+    condition TEXT CHECK(condition IN ('Clear', 'Rain', 'Snow', 'Fog', 'Storm')),
+    risk_level TEXT CHECK(risk_level IN ('Low', 'Medium', 'High')),
+    temperature REAL,
+    wind_speed REAL
+)
+'''
+
+TRAFFIC_TABLE = '''
+CREATE TABLE IF NOT EXISTS traffic (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    route TEXT NOT NULL,
+    congestion_level TEXT CHECK(congestion_level IN ('Low', 'Medium', 'High')),
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    vehicle_count INTEGER,
+    average_speed REAL
+)
+'''
+
 def create_database():
     try:
         # Create data directory if it doesn't exist
@@ -17,6 +41,11 @@ def create_database():
         cursor = conn.cursor()
         print("Database connection established")
 
+        # WAL lets readers, such as the analytics snapshot copy, run while
+        # writers keep committing; the setting is stored in the database file
+        cursor.execute("PRAGMA journal_mode=WAL")
+        print("Journal mode set to WAL")
+
         # Create Flights table
         print("Creating Flights table...")
         cursor.execute('''
@@ -33,17 +62,7 @@ def create_database():
 
         # Create Weather table
         print("Creating Weather table...")
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS weather (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            location TEXT NOT NULL,
-            condition TEXT CHECK(condition IN ('Clear', 'Rain', 'Snow', 'Fog', 'Storm')),
-            risk_level TEXT CHECK(risk_level IN ('Low', 'Medium', 'High')),
-            temperature REAL,
-            wind_speed REAL
-        )
-        ''')
+        cursor.execute(WEATHER_TABLE)
 
         # Create eVTOLs table
         print("Creating eVTOLs table...")
@@ -61,14 +80,86 @@ def create_database():
 
         # Create Traffic table
         print("Creating Traffic table...")
+        cursor.execute(TRAFFIC_TABLE)
+
+        # Create Conflicts table
+        print("Creating Conflicts table...")
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS conflicts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flight_a TEXT NOT NULL,
+            flight_b TEXT NOT NULL,
+            min_separation REAL,
+            time_to_cpa REAL,
+            detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (flight_a) REFERENCES flights(flight_id),
+            FOREIGN KEY (flight_b) REFERENCES flights(flight_id)
+        )
+        ''')
+
+        # Create Port Zones table (maps heliports/vertiports to weather zones)
+        print("Creating Port Zones table...")
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS port_zones (
+            port TEXT PRIMARY KEY,
+            zone TEXT NOT NULL
+        )
+        ''')
+
+        # Create Flight Status Log table, filled by triggers so the alert
+        # engine can follow flight changes incrementally
+        print("Creating Flight Status Log table...")
         cursor.execute('''
-        CREATE TABLE IF NOT EXISTS traffic (
+        CREATE TABLE IF NOT EXISTS flight_status_log (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            route TEXT NOT NULL,
-            congestion_level TEXT CHECK(congestion_level IN ('Low', 'Medium', 'High')),
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            vehicle_count INTEGER,
-            average_speed REAL
+            flight_id TEXT NOT NULL,
+            origin TEXT,
+            destination TEXT,
+            status TEXT,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_flights_insert_log
+        AFTER INSERT ON flights
+        BEGIN
+            INSERT INTO flight_status_log (flight_id, origin, destination, status)
+            VALUES (NEW.flight_id, NEW.origin, NEW.destination, NEW.status);
+        END
+        ''')
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_flights_update_log
+        AFTER UPDATE OF status, origin, destination ON flights
+        BEGIN
+            INSERT INTO flight_status_log (flight_id, origin, destination, status)
+            VALUES (NEW.flight_id, NEW.origin, NEW.destination, NEW.status);
+        END
+        ''')
+
+        # Create Alerts table
+        print("Creating Alerts table...")
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flight_id TEXT NOT NULL,
+            zone TEXT NOT NULL,
+            condition TEXT,
+            risk_level TEXT,
+            observed_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            resolved_at TIMESTAMP,
+            FOREIGN KEY (flight_id) REFERENCES flights(flight_id)
+        )
+        ''')
+
+        # Create Engine Heartbeats table: last run of each background engine,
+        # so the dashboard can tell a stopped engine from an all-clear
+        print("Creating Engine Heartbeats table...")
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS engine_heartbeats (
+            engine TEXT PRIMARY KEY,
+            last_run TIMESTAMP,
+            interval REAL
         )
         ''')
 
@@ -77,6 +168,7 @@ def create_database():
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_flights_status ON flights(status)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_weather_time ON weather(time)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_traffic_route ON traffic(route)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_alerts_active ON alerts(resolved_at, created_at)')
 
         # Verify tables were created
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
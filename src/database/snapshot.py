@@ -0,0 +1,145 @@
+import sqlite3
+import os
+import time
+import threading
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+# Analytics snapshot settings, overridable through the environment
+SNAPSHOT_ENABLED = os.environ.get('EVTOL_ANALYTICS_SNAPSHOT', '0') == '1'
+SNAPSHOT_MAX_AGE = float(os.environ.get('EVTOL_SNAPSHOT_MAX_AGE', '300'))  # seconds
+SNAPSHOT_MMAP_SIZE = int(os.environ.get('EVTOL_SNAPSHOT_MMAP_SIZE', str(256 * 1024 * 1024)))
+
+_refresh_lock = threading.Lock()
+_refreshing = set()
+
+def snapshot_path_for(db_path='data/evtol_operations.db'):
+    # Each database gets its own snapshot next to it: data/x.db -> data/x_snapshot.db
+    db_path = Path(db_path)
+    return str(db_path.with_name(f"{db_path.stem}_snapshot.db"))
+
+def refresh_snapshot(db_path='data/evtol_operations.db', snapshot_path=None):
+    # Copy into a temporary file and swap it in, so readers never see a partial copy
+    snapshot_path = snapshot_path or snapshot_path_for(db_path)
+    taken_at = time.time()
+    tmp_path = f"{snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(tmp_path)
+    try:
+        # In WAL mode the copy reads a consistent version of the database while
+        # writers keep committing; with the rollback journal it would hold a
+        # shared lock for the whole copy. create_database enables WAL, so this
+        # only switches databases created before it did (the setting persists)
+        mode = source.execute("PRAGMA journal_mode").fetchone()[0]
+        if mode != 'wal':
+            print(f"Switching {db_path} from {mode} to WAL journal mode for snapshot copies")
+            source.execute("PRAGMA journal_mode=WAL")
+        source.execute("PRAGMA query_only=1")
+        source.backup(target)
+        target.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        target.close()
+        source.close()
+
+    # The file modification time records when the data was read
+    os.utime(tmp_path, (taken_at, taken_at))
+    try:
+        os.replace(tmp_path, snapshot_path)
+    except PermissionError:
+        # Windows refuses to replace a file that is still open; keep the old
+        # snapshot and try again on the next refresh
+        os.remove(tmp_path)
+        return False
+    return True
+
+def snapshot_time(snapshot_path):
+    try:
+        return datetime.fromtimestamp(os.path.getmtime(snapshot_path))
+    except OSError:
+        return None
+
+def _background_refresh(db_path, snapshot_path):
+    try:
+        refresh_snapshot(db_path, snapshot_path)
+    except sqlite3.Error as e:
+        print(f"Snapshot refresh failed: {str(e)}")
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(snapshot_path)
+
+def ensure_snapshot(db_path='data/evtol_operations.db', snapshot_path=None,
+                    max_age=SNAPSHOT_MAX_AGE):
+    """Return the snapshot's timestamp, refreshing it in the background when stale.
+
+    Readers keep using the stale snapshot while the refresh runs. Returns
+    None when no snapshot exists yet, in which case callers read the live
+    database.
+    """
+    snapshot_path = snapshot_path or snapshot_path_for(db_path)
+    as_of = snapshot_time(snapshot_path)
+    if as_of is not None and (datetime.now() - as_of).total_seconds() <= max_age:
+        return as_of
+
+    with _refresh_lock:
+        # One refresh per snapshot at a time
+        if snapshot_path not in _refreshing:
+            _refreshing.add(snapshot_path)
+            threading.Thread(target=_background_refresh, args=(db_path, snapshot_path),
+                             daemon=True).start()
+    return as_of
+
+# Read connection for heavy analytics paths: the snapshot when enabled,
+# otherwise (or until the first snapshot exists) the live database
+class AnalyticsConnection:
+    def __init__(self, db_path='data/evtol_operations.db', snapshot_path=None,
+                 max_age=SNAPSHOT_MAX_AGE, enabled=SNAPSHOT_ENABLED):
+        self.db_path = db_path
+        self.snapshot_path = snapshot_path or snapshot_path_for(db_path)
+        self.max_age = max_age
+        self.enabled = enabled
+        self.as_of = None
+
+    def __enter__(self):
+        self.as_of = ensure_snapshot(self.db_path, self.snapshot_path, self.max_age) if self.enabled else None
+        if self.as_of is not None:
+            # immutable=1 skips file locking and change detection entirely
+            uri = f"{Path(self.snapshot_path).resolve().as_uri()}?mode=ro&immutable=1"
+            self.conn = sqlite3.connect(uri, uri=True)
+            self.conn.execute(f"PRAGMA mmap_size={SNAPSHOT_MMAP_SIZE}")
+        else:
+            self.as_of = datetime.now()
+            self.conn = sqlite3.connect(self.db_path)
+        return self.conn
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.conn.close()
+
+def run_snapshot_refresher(db_path='data/evtol_operations.db', snapshot_path=None,
+                           interval=SNAPSHOT_MAX_AGE):
+    snapshot_path = snapshot_path or snapshot_path_for(db_path)
+    try:
+        while True:
+            started = time.perf_counter()
+            if refresh_snapshot(db_path, snapshot_path):
+                print(f"Snapshot refreshed in {time.perf_counter() - started:.2f}s: {snapshot_path}")
+            else:
+                print("Snapshot in use, refresh skipped")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Snapshot refresher stopped")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the read-only analytics snapshot")
+    parser.add_argument("--db", default="data/evtol_operations.db")
+    parser.add_argument("--snapshot", help="Snapshot file (default: <db>_snapshot.db next to the database)")
+    parser.add_argument("--interval", type=float, default=SNAPSHOT_MAX_AGE, help="Seconds between refreshes")
+    parser.add_argument("--once", action="store_true", help="Refresh once and exit")
+    args = parser.parse_args()
+
+    if args.once:
+        refresh_snapshot(args.db, args.snapshot)
+        print(f"Snapshot written to {args.snapshot or snapshot_path_for(args.db)}")
+    else:
+        run_snapshot_refresher(args.db, args.snapshot, args.interval)
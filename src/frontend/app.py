@@ -10,8 +10,17 @@ import joblib
 import numpy as np
 from datetime import datetime, timedelta
 import json
+import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from database.queries import ANALYTICS_QUERIES, TIME_FILTERS, analytics_query
+from database.snapshot import AnalyticsConnection
+from database.partitions import PARTITIONING_ENABLED, PARTITIONED_QUERIES, partitioned_analytics, partitioned_columns
+from utils.chart_data import chart_series
+from utils.export import EXPORT_FORMATS, REPORTS, export_analytics, export_table, generate_report
+from utils.heartbeat import engine_status
+
 # Page configuration with custom theme
 st.set_page_config(
     page_title="eVTOL Operations Dashboard",
@@ -82,6 +91,38 @@ class DatabaseConnection:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.conn.close()
 
+# Heavy aggregations read from the analytics snapshot when it is enabled
+analytics_db = AnalyticsConnection()
+
+def load_analytics(name, time_range="All Time"):
+    # Weather and traffic aggregates fan out over the zone partitions when enabled
+    if PARTITIONING_ENABLED and name in PARTITIONED_QUERIES:
+        return pd.DataFrame(partitioned_analytics(name, time_range), columns=partitioned_columns(name))
+    with analytics_db as conn:
+        return pd.read_sql(analytics_query(name, time_range), conn)
+
+# Alerts are precomputed by the alert engine (src/utils/alerts.py)
+@st.cache_data(ttl=5)
+def load_open_alerts(limit=50):
+    with DatabaseConnection() as conn:
+        return pd.read_sql("""
+            SELECT flight_id, zone, condition, risk_level, observed_at, created_at
+            FROM alerts
+            WHERE resolved_at IS NULL
+            ORDER BY created_at DESC LIMIT ?
+        """, conn, params=(limit,))
+
+# Last run of a background engine (alerts, deconfliction) and whether it is stale
+@st.cache_data(ttl=5)
+def load_engine_status(engine):
+    with DatabaseConnection() as conn:
+        return engine_status(conn, engine)
+
+def show_data_as_of():
+    # Partitioned reads are live, so only snapshot reads carry an older timestamp
+    as_of = analytics_db.as_of or datetime.now()
+    st.caption(f"Data as of {as_of:%Y-%m-%d %H:%M:%S}")
+
 def get_weather_icon(condition):
     icons = {
         'Clear': '☀️',
@@ -92,8 +133,9 @@ def get_weather_icon(condition):
     }
     return icons.get(condition, '❓')
 
-def create_map(flights_df):
+def create_map(flights_df, conflicts_df=None):
     m = folium.Map(location=[40.7128, -74.0060], zoom_start=10)
+    positions = {}
     
     for _, flight in flights_df.iterrows():
         if flight['path']:
@@ -105,9 +147,25 @@ def create_map(flights_df):
                     color='red' if flight['status'] == 'In Progress' else 'blue',
                     popup=f"Flight {flight['flight_id']}\n{flight['status']}"
                 ).add_to(m)
+                positions[flight['flight_id']] = path
             except:
                 continue
     
+    # Conflict overlay: link each pair violating the separation minimum
+    if conflicts_df is not None:
+        for _, conflict in conflicts_df.iterrows():
+            if conflict['flight_a'] in positions and conflict['flight_b'] in positions:
+                folium.PolyLine(
+                    locations=[positions[conflict['flight_a']], positions[conflict['flight_b']]],
+                    color='orange',
+                    weight=4,
+                    dash_array='6',
+                    tooltip=f"Conflict {conflict['flight_a']} / {conflict['flight_b']}: "
+                            f"{conflict['min_separation']:.0f} m "
+                            + (f"in {conflict['time_to_cpa']:.0f} s " if conflict['time_to_cpa'] > 0 else "now ")
+                            + f"(detected {conflict['detected_at']})"
+                ).add_to(m)
+    
     return m
 
 # Sidebar navigation
@@ -131,9 +189,11 @@ if page == "📊 Dashboard":
         active_flights = pd.read_sql("SELECT COUNT(*) as count FROM flights WHERE status='In Progress'", conn).iloc[0]['count']
         total_evtols = pd.read_sql("SELECT COUNT(*) as count FROM evtols", conn).iloc[0]['count']
         critical_maintenance = pd.read_sql("SELECT COUNT(*) as count FROM evtols WHERE maintenance_status='Critical'", conn).iloc[0]['count']
+        airspace_conflicts = pd.read_sql("SELECT COUNT(*) as count FROM conflicts", conn).iloc[0]['count']
+    conflicts_last_run, conflicts_stale = load_engine_status('deconfliction')
     
     # Top metrics
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5 = st.columns(5)
     with col1:
         st.metric("Active Flights", active_flights, "Real-time")
     with col2:
@@ -144,6 +204,13 @@ if page == "📊 Dashboard":
         with DatabaseConnection() as conn:
             avg_battery = pd.read_sql("SELECT AVG(battery_status) as avg FROM evtols", conn).iloc[0]['avg']
         st.metric("Avg Battery Level", f"{avg_battery:.1f}%")
+    with col5:
+        # Conflict rows outlive the engine, so a stale count is flagged rather than trusted
+        if conflicts_stale:
+            st.metric("Airspace Conflicts", airspace_conflicts, "Detection stopped", delta_color="off")
+        else:
+            st.metric("Airspace Conflicts", airspace_conflicts, "Separation loss" if airspace_conflicts > 0 else "All clear")
+        st.caption(f"Checked {conflicts_last_run:%H:%M:%S}" if conflicts_last_run else "Never checked")
     
     # Main content
     col1, col2 = st.columns([2, 1])
@@ -152,35 +219,34 @@ if page == "📊 Dashboard":
         st.subheader("Live Flight Map")
         with DatabaseConnection() as conn:
             flights_df = pd.read_sql("SELECT * FROM flights WHERE status='In Progress'", conn)
-        folium_static(create_map(flights_df))
+            conflicts_df = pd.read_sql("SELECT * FROM conflicts", conn)
+        folium_static(create_map(flights_df, conflicts_df))
         
     with col2:
         st.subheader("Weather Alerts")
-        with DatabaseConnection() as conn:
-            weather_data = pd.read_sql("""
-                SELECT location, condition, risk_level, temperature, wind_speed
-                FROM weather
-                WHERE time >= datetime('now', '-1 hour')
-                ORDER BY time DESC LIMIT 5
-            """, conn)
+        open_alerts = load_open_alerts()
+        alerts_last_run, alerts_stale = load_engine_status('alerts')
         
-        for _, weather in weather_data.iterrows():
-            with st.expander(f"{get_weather_icon(weather['condition'])} {weather['location']}"):
-                st.write(f"Risk Level: {weather['risk_level']}")
-                st.write(f"Temperature: {weather['temperature']}°C")
-                st.write(f"Wind Speed: {weather['wind_speed']} km/h")
+        # Without a running engine, an empty table is not an all-clear
+        if alerts_stale:
+            last_run = f"last run {alerts_last_run:%Y-%m-%d %H:%M:%S}" if alerts_last_run else "never run"
+            st.warning(f"Alert engine is not running ({last_run}); alerts may be out of date. "
+                       "Start it with `python src/utils/alerts.py`.")
+        elif open_alerts.empty:
+            st.info("No flights in high-risk weather.")
+        for zone, zone_alerts in open_alerts.groupby('zone', sort=False):
+            latest = zone_alerts.iloc[0]
+            with st.expander(f"{get_weather_icon(latest['condition'])} {zone} - {len(zone_alerts)} flight(s) affected"):
+                st.write(f"Risk Level: {latest['risk_level']}")
+                st.write(f"Condition: {latest['condition']} (observed {latest['observed_at']})")
+                st.write("Flights: " + ", ".join(zone_alerts['flight_id']))
 
     # Traffic and Battery Analytics
     st.subheader("System Analytics")
     col1, col2 = st.columns(2)
     
     with col1:
-        with DatabaseConnection() as conn:
-            traffic_data = pd.read_sql("""
-                SELECT route, congestion_level, COUNT(*) as count
-                FROM traffic
-                GROUP BY route, congestion_level
-            """, conn)
+        traffic_data = load_analytics("traffic_density")
         
         fig = px.density_heatmap(
             traffic_data,
@@ -193,7 +259,7 @@ if page == "📊 Dashboard":
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
-        with DatabaseConnection() as conn:
+        with analytics_db as conn:
             battery_data = pd.read_sql("""
                 SELECT model_type, AVG(battery_status) as avg_battery,
                        COUNT(*) as count
@@ -210,6 +276,8 @@ if page == "📊 Dashboard":
             labels={"avg_battery": "Average Battery Level (%)"}
         )
         st.plotly_chart(fig, use_container_width=True)
+    
+    show_data_as_of()
 
 elif page == "✈️ Flight Management":
     st.title("Flight Operations Center")
@@ -303,6 +371,9 @@ elif page == "✈️ Flight Management":
                 conn
             )
         
+        # Rows written by SQLite and by Python use different timestamp formats
+        flight_history['created_at'] = pd.to_datetime(flight_history['created_at'], format='mixed')
+        
         # Flight history visualization
         fig = px.timeline(
             flight_history,
@@ -408,12 +479,7 @@ elif page == "🛡️ Safety Analysis":
         
         with col2:
             st.subheader("Historical Risk Patterns")
-            with DatabaseConnection() as conn:
-                historical_risks = pd.read_sql("""
-                    SELECT risk_level, COUNT(*) as count
-                    FROM weather
-                    GROUP BY risk_level
-                """, conn)
+            historical_risks = load_analytics("risk_distribution")
             
             fig = px.pie(
                 historical_risks,
@@ -428,6 +494,7 @@ elif page == "🛡️ Safety Analysis":
                 }
             )
             st.plotly_chart(fig)
+            show_data_as_of()
 
 elif page == "🔧 Maintenance Hub":
     st.title("Maintenance Control Center")
@@ -507,27 +574,14 @@ elif page == "📈 Analytics":
     # Time range selector
     time_range = st.selectbox(
         "Time Range",
-        ["Last 24 Hours", "Last Week", "Last Month", "All Time"]
+        list(TIME_FILTERS)
     )
     
-    time_filters = {
-        "Last 24 Hours": "datetime('now', '-1 day')",
-        "Last Week": "datetime('now', '-7 days')",
-        "Last Month": "datetime('now', '-30 days')",
-        "All Time": "datetime('now', '-100 years')"  # Effectively all time
-    }
-    
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Flight Statistics")
-        with DatabaseConnection() as conn:
-            flight_stats = pd.read_sql(f"""
-                SELECT status, COUNT(*) as count
-                FROM flights
-                WHERE created_at >= {time_filters[time_range]}
-                GROUP BY status
-            """, conn)
+        flight_stats = load_analytics("flight_stats", time_range)
         
         fig = px.pie(
             flight_stats,
@@ -539,15 +593,7 @@ elif page == "📈 Analytics":
     
     with col2:
         st.subheader("Energy Consumption Trends")
-        with DatabaseConnection() as conn:
-            energy_data = pd.read_sql(f"""
-                SELECT DATE(created_at) as date,
-                       AVG(energy_consumption) as avg_energy
-                FROM flights
-                WHERE created_at >= {time_filters[time_range]}
-                GROUP BY DATE(created_at)
-                ORDER BY date
-            """, conn)
+        energy_data = chart_series(load_analytics, "energy_trends", time_range, x='date', y='avg_energy')
         
         fig = px.line(
             energy_data,
@@ -557,21 +603,15 @@ elif page == "📈 Analytics":
         )
         st.plotly_chart(fig)
     
+    show_data_as_of()
+    
     # Advanced Analytics
     st.subheader("Advanced Analytics")
     
-    tabs = st.tabs(["Traffic Patterns", "Safety Trends", "Maintenance Analysis"])
+    tabs = st.tabs(["Traffic Patterns", "Safety Trends", "Maintenance Analysis", "Custom Reports"])
     
     with tabs[0]:
-        with DatabaseConnection() as conn:
-            hourly_traffic = pd.read_sql(f"""
-                SELECT strftime('%H', timestamp) as hour,
-                       route,
-                       AVG(vehicle_count) as avg_vehicles
-                FROM traffic
-                WHERE timestamp >= {time_filters[time_range]}
-                GROUP BY hour, route
-            """, conn)
+        hourly_traffic = load_analytics("hourly_traffic", time_range)
         
         fig = px.density_heatmap(
             hourly_traffic,
@@ -583,16 +623,8 @@ elif page == "📈 Analytics":
         st.plotly_chart(fig)
     
     with tabs[1]:
-        with DatabaseConnection() as conn:
-            safety_trends = pd.read_sql(f"""
-                SELECT DATE(time) as date,
-                       risk_level,
-                       COUNT(*) as count
-                FROM weather
-                WHERE time >= {time_filters[time_range]}
-                GROUP BY date, risk_level
-                ORDER BY date
-            """, conn)
+        safety_trends = chart_series(load_analytics, "safety_trends", time_range,
+                                     x='date', y='count', group='risk_level')
         
         fig = px.area(
             safety_trends,
@@ -601,18 +633,12 @@ elif page == "📈 Analytics":
             color='risk_level',
             title='Safety Risk Trends Over Time'
         )
+        # Downsampled series need not share dates; interpolate instead of stacking zeros
+        fig.update_traces(stackgaps='interpolate')
         st.plotly_chart(fig)
     
     with tabs[2]:
-        with DatabaseConnection() as conn:
-            maintenance_analysis = pd.read_sql(f"""
-                SELECT model_type,
-                       AVG(usage_count) as avg_usage,
-                       COUNT(*) as total_vehicles,
-                       SUM(CASE WHEN maintenance_status != 'OK' THEN 1 ELSE 0 END) as maintenance_needed
-                FROM evtols
-                GROUP BY model_type
-            """, conn)
+        maintenance_analysis = load_analytics("maintenance_analysis", time_range)
         
         fig = make_subplots(specs=[[{"secondary_y": True}]])
         
@@ -640,6 +666,43 @@ elif page == "📈 Analytics":
         fig.update_yaxes(title_text="Maintenance Rate (%)", secondary_y=True)
         
         st.plotly_chart(fig)
+    
+    with tabs[3]:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.write("Data Export")
+            with DatabaseConnection() as conn:
+                tables = pd.read_sql("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'", conn)['name'].tolist()
+            source = st.selectbox(
+                "Source",
+                [f"Table: {table}" for table in tables] + [f"Query: {name}" for name in ANALYTICS_QUERIES]
+            )
+            export_format = st.selectbox("Format", list(EXPORT_FORMATS), key="export_format")
+            
+            if st.button("Export", key="export_data"):
+                kind, name = source.split(": ", 1)
+                path = Path("exports") / f"{name}_{datetime.now().strftime('%Y%m%d%H%M%S')}{EXPORT_FORMATS[export_format]}"
+                try:
+                    if kind == "Table":
+                        rows = export_table(name, path, export_format)
+                    else:
+                        rows = export_analytics(name, path, export_format, time_range)
+                    st.success(f"Exported {rows} rows to {path}")
+                except Exception as e:
+                    st.error(f"Error exporting data: {str(e)}")
+        
+        with col2:
+            st.write("Summary Reports")
+            report = st.selectbox("Report", list(REPORTS))
+            report_format = st.selectbox("Format", list(EXPORT_FORMATS), key="report_format")
+            
+            if st.button("Generate Report", key="generate_report"):
+                try:
+                    report_dir = generate_report(report, time_range, report_format)
+                    st.success(f"Report generated in {report_dir}")
+                except Exception as e:
+                    st.error(f"Error generating report: {str(e)}")
 
 # Footer
 st.markdown("---")
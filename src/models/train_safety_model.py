@@ -0,0 +1,92 @@
+import argparse
+import sqlite3
+import sys
+import numpy as np
+from pathlib import Path
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from training import (CHUNK_SIZE, PARTITIONING_ENABLED, RISK_LEVELS, WEATHER_CONDITIONS,
+                      print_metrics, save_artifacts, train_incremental, training_sources)
+from database.partitions import fan_out_aggregate
+
+# Traffic is reduced to one average per hour first, so joining it to the
+# weather observations stays linear and the lookup holds one entry per hour
+HOURLY_TRAFFIC = {
+    'group_by': {'hour': "strftime('%Y-%m-%d %H', timestamp)"},
+    'metrics': {'vehicle_count': ('avg', 'vehicle_count'), 'average_speed': ('avg', 'average_speed')}
+}
+
+HOURLY_TRAFFIC_QUERY = """
+    SELECT strftime('%Y-%m-%d %H', timestamp) as hour,
+           AVG(vehicle_count) as vehicle_count,
+           AVG(average_speed) as average_speed
+    FROM traffic
+    GROUP BY hour
+"""
+
+WEATHER_QUERY = """
+    SELECT condition, temperature, wind_speed,
+           strftime('%Y-%m-%d %H', time) as hour, risk_level
+    FROM weather
+    WHERE risk_level IS NOT NULL
+    ORDER BY id
+"""
+
+def load_hourly_traffic(db_path='data/evtol_operations.db'):
+    if PARTITIONING_ENABLED:
+        rows = fan_out_aggregate('traffic', HOURLY_TRAFFIC['group_by'], HOURLY_TRAFFIC['metrics'])
+        return {row['hour']: (row['vehicle_count'], row['average_speed']) for row in rows}
+
+    conn = sqlite3.connect(db_path)
+    try:
+        return {hour: (vehicle_count, average_speed)
+                for hour, vehicle_count, average_speed in conn.execute(HOURLY_TRAFFIC_QUERY)}
+    finally:
+        conn.close()
+
+def train_safety_model(db_path='data/evtol_operations.db', chunk_size=CHUNK_SIZE, epochs=5,
+                       models_dir='models'):
+    label_encoder = LabelEncoder().fit(WEATHER_CONDITIONS)
+    risk_index = {level: i for i, level in enumerate(RISK_LEVELS)}
+    hourly_traffic = load_hourly_traffic(db_path)
+
+    # Weather observations joined to the average traffic of the same hour;
+    # hours without traffic are dropped, as the SQL inner join did
+    def join_traffic(rows):
+        return [row[:3] + hourly_traffic[row[3]] + row[4:]
+                for row in rows if row[3] in hourly_traffic]
+
+    # Same feature order as the Safety Analysis page:
+    # condition, temperature, wind speed, vehicle count, average speed
+    def featurize(rows):
+        conditions = label_encoder.transform([row[0] for row in rows])
+        X = np.column_stack([conditions, np.array([row[1:5] for row in rows], dtype=float)])
+        y = np.array([risk_index[row[5]] for row in rows])
+        return np.nan_to_num(X), y
+
+    scaler = StandardScaler()
+    model = SGDClassifier(loss='log_loss', random_state=42)
+    metrics = train_incremental(WEATHER_QUERY, featurize, scaler, model,
+                                classes=np.arange(len(RISK_LEVELS)),
+                                sources=training_sources('weather', db_path),
+                                chunk_size=chunk_size, epochs=epochs, prepare=join_traffic)
+
+    version_dir = save_artifacts('safety_model', {
+        'safety_model': model,
+        'safety_scaler': scaler,
+        'safety_label_encoder': label_encoder
+    }, metrics, models_dir)
+    print_metrics('Safety model', metrics, version_dir)
+    return version_dir
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the safety risk assessment model")
+    parser.add_argument("--db", default="data/evtol_operations.db")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--models-dir", default="models")
+    args = parser.parse_args()
+
+    train_safety_model(args.db, args.chunk_size, args.epochs, args.models_dir)
@@ -0,0 +1,54 @@
+import argparse
+import sys
+import numpy as np
+from pathlib import Path
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from training import CHUNK_SIZE, print_metrics, save_artifacts, train_incremental, training_sources
+
+CONGESTION_LEVELS = ['Low', 'Medium', 'High']
+
+TRAINING_QUERY = """
+    SELECT CAST(strftime('%H', timestamp) AS INTEGER) as hour,
+           CAST(strftime('%w', timestamp) AS INTEGER) as day_of_week,
+           vehicle_count, average_speed, congestion_level
+    FROM traffic
+    WHERE congestion_level IS NOT NULL
+    ORDER BY id
+"""
+
+def train_traffic_model(db_path='data/evtol_operations.db', chunk_size=CHUNK_SIZE, epochs=5,
+                        models_dir='models'):
+    congestion_index = {level: i for i, level in enumerate(CONGESTION_LEVELS)}
+
+    # Features: hour of day, day of week, vehicle count, average speed
+    def featurize(rows):
+        X = np.array([row[:4] for row in rows], dtype=float)
+        y = np.array([congestion_index[row[4]] for row in rows])
+        return np.nan_to_num(X), y
+
+    scaler = StandardScaler()
+    model = SGDClassifier(loss='log_loss', random_state=42)
+    metrics = train_incremental(TRAINING_QUERY, featurize, scaler, model,
+                                classes=np.arange(len(CONGESTION_LEVELS)),
+                                sources=training_sources('traffic', db_path),
+                                chunk_size=chunk_size, epochs=epochs)
+
+    version_dir = save_artifacts('traffic_model', {
+        'traffic_model': model,
+        'traffic_scaler': scaler
+    }, metrics, models_dir)
+    print_metrics('Traffic model', metrics, version_dir)
+    return version_dir
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the traffic congestion prediction model")
+    parser.add_argument("--db", default="data/evtol_operations.db")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--models-dir", default="models")
+    args = parser.parse_args()
+
+    train_traffic_model(args.db, args.chunk_size, args.epochs, args.models_dir)
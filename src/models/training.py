@@ -0,0 +1,158 @@
+import sqlite3
+import sys
+import json
+import time
+import shutil
+import joblib
+import numpy as np
+import sklearn
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.export import iter_chunks
+from database.partitions import PARTITIONING_ENABLED, list_partitions
+
+# Rows per training chunk; memory use is bounded by one chunk
+CHUNK_SIZE = 50000
+
+# Every HOLDOUT_EVERY-th row is held out for evaluation
+HOLDOUT_EVERY = 5
+
+RISK_LEVELS = ['Low', 'Medium', 'High']
+WEATHER_CONDITIONS = ['Clear', 'Rain', 'Snow', 'Fog', 'Storm']
+
+def training_sources(table, db_path='data/evtol_operations.db'):
+    # With partitioning on, the time series live in one file per zone or route
+    if PARTITIONING_ENABLED:
+        return [str(path) for path in list_partitions(table)]
+    return [db_path]
+
+def stream_chunks(sql, sources, chunk_size=CHUNK_SIZE, prepare=None):
+    # Each pass re-runs the query on every source in turn so the data never
+    # has to fit in memory; `prepare` maps each chunk before the holdout split
+    offset = 0
+    for source in sources:
+        conn = sqlite3.connect(source)
+        try:
+            _, chunks = iter_chunks(conn, sql, chunk_size=chunk_size)
+            for rows in chunks:
+                if prepare is not None:
+                    rows = prepare(rows)
+                    if not rows:
+                        continue
+                holdout = (np.arange(offset, offset + len(rows)) % HOLDOUT_EVERY) == 0
+                offset += len(rows)
+                yield rows, holdout
+        finally:
+            conn.close()
+
+def train_incremental(sql, featurize, scaler, model, classes, sources,
+                      chunk_size=CHUNK_SIZE, epochs=5, seed=42, prepare=None):
+    """Fit `scaler` and `model` with partial_fit over a query streamed from `sources`.
+
+    `featurize` turns a chunk of rows into (X, y). The first pass fits the
+    scaler, the next `epochs` passes fit the model and a final pass scores
+    the held-out rows. Returns the training metrics.
+    """
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+
+    train_rows = test_rows = 0
+    for rows, holdout in stream_chunks(sql, sources, chunk_size, prepare):
+        X, _ = featurize(rows)
+        if (~holdout).any():
+            scaler.partial_fit(X[~holdout])
+        train_rows += int((~holdout).sum())
+        test_rows += int(holdout.sum())
+    if train_rows == 0:
+        raise ValueError("No training data found")
+
+    for epoch in range(epochs):
+        for rows, holdout in stream_chunks(sql, sources, chunk_size, prepare):
+            X, y = featurize(rows)
+            X, y = X[~holdout], y[~holdout]
+            if not len(y):
+                continue
+            # Chunks arrive in table order; shuffle within each chunk for SGD
+            order = rng.permutation(len(y))
+            model.partial_fit(scaler.transform(X[order]), y[order], classes=classes)
+
+    correct = 0
+    sample = None
+    for rows, holdout in stream_chunks(sql, sources, chunk_size, prepare):
+        X, y = featurize(rows)
+        X, y = X[holdout], y[holdout]
+        if not len(y):
+            continue
+        correct += int((model.predict(scaler.transform(X)) == y).sum())
+        if sample is None:
+            sample = X
+
+    return {
+        "train_rows": train_rows,
+        "test_rows": test_rows,
+        "epochs": epochs,
+        "accuracy": correct / test_rows if test_rows else None,
+        "training_seconds": time.perf_counter() - started,
+        "benchmark": benchmark_inference(scaler, model, sample) if sample is not None else None
+    }
+
+def benchmark_inference(scaler, model, X, single_runs=200, batch_runs=5):
+    # Latency of one prediction as the dashboard makes it, and batch throughput
+    latencies = []
+    for i in range(single_runs):
+        row = X[i % len(X)].reshape(1, -1)
+        started = time.perf_counter()
+        model.predict_proba(scaler.transform(row))
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    batch = np.resize(X, (max(len(X), 10000), X.shape[1]))
+    started = time.perf_counter()
+    for _ in range(batch_runs):
+        model.predict_proba(scaler.transform(batch))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "latency_ms_p50": float(np.percentile(latencies, 50)),
+        "latency_ms_p95": float(np.percentile(latencies, 95)),
+        "throughput_rows_per_s": len(batch) * batch_runs / elapsed,
+        "batch_size": len(batch)
+    }
+
+def save_artifacts(name, artifacts, metrics, models_dir='models'):
+    # Each run is kept under models/versions/<version>/ and the files the
+    # dashboard loads are replaced with the new version
+    version = datetime.now().strftime('%Y%m%d%H%M%S')
+    version_dir = Path(models_dir) / 'versions' / version
+    version_dir.mkdir(parents=True, exist_ok=True)
+
+    for artifact_name, artifact in artifacts.items():
+        joblib.dump(artifact, version_dir / f"{artifact_name}.joblib")
+
+    metadata = {
+        "model": name,
+        "version": version,
+        "trained_at": datetime.now().isoformat(),
+        "sklearn_version": sklearn.__version__,
+        "artifacts": sorted(f"{artifact_name}.joblib" for artifact_name in artifacts),
+        "metrics": metrics
+    }
+    with open(version_dir / f"{name}_metadata.json", 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    for file in [*metadata["artifacts"], f"{name}_metadata.json"]:
+        shutil.copy2(version_dir / file, Path(models_dir) / file)
+    return version_dir
+
+def print_metrics(name, metrics, version_dir):
+    print(f"{name} trained on {metrics['train_rows']} rows, "
+          f"evaluated on {metrics['test_rows']} rows")
+    if metrics['accuracy'] is not None:
+        print(f"Accuracy: {metrics['accuracy']:.3f}")
+    if metrics['benchmark']:
+        benchmark = metrics['benchmark']
+        print(f"Inference latency: p50 {benchmark['latency_ms_p50']:.2f} ms, "
+              f"p95 {benchmark['latency_ms_p95']:.2f} ms")
+        print(f"Batch throughput: {benchmark['throughput_rows_per_s']:,.0f} rows/s")
+    print(f"Artifacts saved to {version_dir}")
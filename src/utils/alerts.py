@@ -0,0 +1,250 @@
+import sqlite3
+import os
+import sys
+import time
+import argparse
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from database.partitions import PARTITIONING_ENABLED, list_partitions
+from utils.heartbeat import record_heartbeat
+
+# Risk level that puts flights in a zone on alert
+ALERT_RISK_LEVEL = 'High'
+
+# Weather older than this no longer counts as the zone's current risk
+WEATHER_MAX_AGE = float(os.environ.get('EVTOL_WEATHER_MAX_AGE', '3600'))  # seconds
+
+def utc_now():
+    # weather.time defaults to CURRENT_TIMESTAMP, which is UTC; ages are
+    # measured on that clock, as naive datetimes like the stored values
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def parse_time(value):
+    try:
+        parsed = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+class WeatherAlertEngine:
+    """Incrementally matches High-risk weather zones to active flights.
+
+    Keeps the current risk per zone, the zones of every active flight and
+    the open alerts in memory. New weather rows and flight status changes
+    (from the flight_status_log table) only touch the flights of the zone
+    or the single flight concerned, so the work per event does not depend
+    on the fleet size. Alerts are written to the alerts table.
+
+    A zone's risk is its most recent reading by observation time, and it
+    expires once that reading is older than `max_age` seconds.
+    """
+
+    def __init__(self, db_path='data/evtol_operations.db', partitioned=PARTITIONING_ENABLED,
+                 max_age=WEATHER_MAX_AGE):
+        self.db_path = db_path
+        self.partitioned = partitioned
+        self.max_age = timedelta(seconds=max_age)
+        self.conn = sqlite3.connect(db_path)
+
+        self.port_zones = {}
+        self.zone_risk = {}                    # zone -> (condition, risk_level, observed_at)
+        self.zone_flights = defaultdict(set)   # zone -> active flight ids
+        self.flight_zones = {}                 # flight id -> zones
+        self.open_alerts = {}                  # (flight id, zone) -> alert id
+
+        self.weather_sources = {}              # weather db path -> last weather id seen
+        self.last_flight_event = 0
+
+    def close(self):
+        self.conn.close()
+
+    def load_port_zones(self):
+        self.port_zones = dict(self.conn.execute("SELECT port, zone FROM port_zones"))
+
+    def zones_for(self, origin, destination):
+        unknown = {port for port in (origin, destination) if port not in self.port_zones}
+        if unknown:
+            # Ports can be added while running; the table is tiny
+            self.load_port_zones()
+        return {self.port_zones[port] for port in (origin, destination) if port in self.port_zones}
+
+    def weather_paths(self):
+        # Weather lives in the main database or, when partitioned, one file per zone
+        if self.partitioned:
+            return [str(path) for path in list_partitions('weather')]
+        return [self.db_path]
+
+    def bootstrap(self):
+        # One full read of the current state; everything after is incremental
+        self.load_port_zones()
+
+        self.last_flight_event = self.conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM flight_status_log"
+        ).fetchone()[0]
+        for flight_id, origin, destination in self.conn.execute(
+            "SELECT flight_id, origin, destination FROM flights WHERE status='In Progress'"
+        ):
+            self.track_flight(flight_id, origin, destination)
+
+        for alert_id, flight_id, zone in self.conn.execute(
+            "SELECT id, flight_id, zone FROM alerts WHERE resolved_at IS NULL"
+        ):
+            self.open_alerts[(flight_id, zone)] = alert_id
+
+        for path in self.weather_paths():
+            self.weather_sources[path] = self.read_weather(path, latest_only=True)
+
+        # Reconcile open alerts with the state just loaded
+        for flight_id, zone in list(self.open_alerts):
+            if flight_id not in self.flight_zones or not self.zone_on_alert(zone):
+                self.resolve_alert(flight_id, zone)
+        for zone, flights in self.zone_flights.items():
+            if self.zone_on_alert(zone):
+                for flight_id in flights:
+                    self.raise_alert(flight_id, zone)
+        self.conn.commit()
+
+    def read_weather(self, path, after_id=0, latest_only=False):
+        if path == self.db_path:
+            conn = self.conn
+        else:
+            conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            if latest_only:
+                cutoff = (utc_now() - self.max_age).strftime('%Y-%m-%d %H:%M:%S')
+                rows = conn.execute('''
+                    SELECT w.id, w.location, w.condition, w.risk_level, w.time
+                    FROM weather w
+                    JOIN (SELECT location, MAX(time) as time FROM weather
+                          WHERE time >= ? GROUP BY location) latest
+                    ON latest.location = w.location AND latest.time = w.time
+                    ORDER BY w.id
+                ''', (cutoff,)).fetchall()
+                last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM weather").fetchone()[0]
+            else:
+                rows = conn.execute('''
+                    SELECT id, location, condition, risk_level, time
+                    FROM weather WHERE id > ? ORDER BY id
+                ''', (after_id,)).fetchall()
+                last_id = rows[-1][0] if rows else after_id
+        finally:
+            if conn is not self.conn:
+                conn.close()
+
+        for _, location, condition, risk_level, observed_at in rows:
+            self.on_weather(location, condition, risk_level, observed_at)
+        return last_id
+
+    def zone_on_alert(self, zone):
+        return zone in self.zone_risk and self.zone_risk[zone][1] == ALERT_RISK_LEVEL
+
+    def track_flight(self, flight_id, origin, destination):
+        zones = self.zones_for(origin, destination)
+        self.flight_zones[flight_id] = zones
+        for zone in zones:
+            self.zone_flights[zone].add(flight_id)
+        return zones
+
+    def untrack_flight(self, flight_id):
+        zones = self.flight_zones.pop(flight_id, set())
+        for zone in zones:
+            self.zone_flights[zone].discard(flight_id)
+        return zones
+
+    def raise_alert(self, flight_id, zone):
+        if (flight_id, zone) in self.open_alerts:
+            return
+        condition, risk_level, observed_at = self.zone_risk[zone]
+        cursor = self.conn.execute('''
+            INSERT INTO alerts (flight_id, zone, condition, risk_level, observed_at, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (flight_id, zone, condition, risk_level, observed_at, utc_now()))
+        self.open_alerts[(flight_id, zone)] = cursor.lastrowid
+
+    def resolve_alert(self, flight_id, zone):
+        alert_id = self.open_alerts.pop((flight_id, zone), None)
+        if alert_id is not None:
+            self.conn.execute(
+                "UPDATE alerts SET resolved_at=? WHERE id=?",
+                (utc_now(), alert_id)
+            )
+
+    def on_weather(self, zone, condition, risk_level, observed_at):
+        observed_at = parse_time(observed_at)
+        if observed_at is None or utc_now() - observed_at > self.max_age:
+            return
+        # Readings can arrive out of order; only a newer one replaces the current risk
+        current = self.zone_risk.get(zone)
+        if current is not None and current[2] > observed_at:
+            return
+
+        self.zone_risk[zone] = (condition, risk_level, observed_at)
+        for flight_id in self.zone_flights.get(zone, ()):
+            if risk_level == ALERT_RISK_LEVEL:
+                self.raise_alert(flight_id, zone)
+            else:
+                self.resolve_alert(flight_id, zone)
+
+    def expire_weather(self):
+        # Zones without a recent reading are no longer on alert
+        cutoff = utc_now() - self.max_age
+        for zone in [zone for zone, (_, _, observed_at) in self.zone_risk.items() if observed_at < cutoff]:
+            del self.zone_risk[zone]
+            for flight_id in self.zone_flights.get(zone, ()):
+                self.resolve_alert(flight_id, zone)
+
+    def on_flight_status(self, flight_id, origin, destination, status):
+        for zone in self.untrack_flight(flight_id):
+            self.resolve_alert(flight_id, zone)
+        if status == 'In Progress':
+            for zone in self.track_flight(flight_id, origin, destination):
+                if self.zone_on_alert(zone):
+                    self.raise_alert(flight_id, zone)
+
+    def poll(self):
+        # Apply flight changes first so new weather sees the current fleet
+        events = self.conn.execute('''
+            SELECT id, flight_id, origin, destination, status
+            FROM flight_status_log WHERE id > ? ORDER BY id
+        ''', (self.last_flight_event,)).fetchall()
+        for event_id, flight_id, origin, destination, status in events:
+            self.on_flight_status(flight_id, origin, destination, status)
+            self.last_flight_event = event_id
+
+        for path in self.weather_paths():
+            self.weather_sources[path] = self.read_weather(path, self.weather_sources.get(path, 0))
+        self.expire_weather()
+
+        self.conn.commit()
+        return len(events)
+
+def run_alert_engine(db_path='data/evtol_operations.db', interval=1.0):
+    engine = WeatherAlertEngine(db_path)
+    try:
+        engine.bootstrap()
+        print(f"Alert engine started: {len(engine.flight_zones)} active flights, "
+              f"{len(engine.open_alerts)} open alerts")
+        while True:
+            open_before = len(engine.open_alerts)
+            engine.poll()
+            record_heartbeat(engine.conn, 'alerts', interval)
+            if len(engine.open_alerts) != open_before:
+                print(f"{datetime.now():%H:%M:%S} {len(engine.open_alerts)} open alerts")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Alert engine stopped")
+    finally:
+        engine.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Weather alert engine for active flights")
+    parser.add_argument("--db", default="data/evtol_operations.db")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polls")
+    args = parser.parse_args()
+
+    run_alert_engine(args.db, args.interval)
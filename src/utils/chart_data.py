@@ -0,0 +1,93 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.cache import TTLCache
+
+# Points per series sent to the browser, roughly one per horizontal pixel
+POINT_BUDGET = int(os.environ.get('EVTOL_CHART_POINT_BUDGET', '1000'))
+CHART_CACHE_TTL = float(os.environ.get('EVTOL_CHART_CACHE_TTL', '60'))  # seconds
+
+chart_cache = TTLCache(ttl=CHART_CACHE_TTL)
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of `n_out` points that keep the visual shape."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        # Keep the point forming the largest triangle with the previous pick
+        # and the average of the next bucket
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+    indices[-1] = n - 1
+    return indices
+
+def minmax_buckets(x, y, n_out):
+    """Indices of the minimum and maximum of equal buckets plus both ends, keeping every spike."""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, (n_out - 2) // 2 + 1).astype(np.int64)
+    starts = edges[:-1]
+    mins = np.array([start + y[start:end].argmin() for start, end in zip(starts, edges[1:])])
+    maxs = np.array([start + y[start:end].argmax() for start, end in zip(starts, edges[1:])])
+    return np.unique(np.concatenate(([0, n - 1], mins, maxs)))
+
+DOWNSAMPLERS = {
+    'lttb': lttb,
+    'minmax': minmax_buckets
+}
+
+def numeric_axis(values):
+    # Dates and timestamps become nanoseconds; categories fall back to position
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=float)
+    try:
+        return pd.to_datetime(values, format='mixed').astype('int64').to_numpy(dtype=float)
+    except (ValueError, TypeError):
+        return np.arange(len(values), dtype=float)
+
+def downsample(df, x, y, budget=POINT_BUDGET, method='lttb', group=None):
+    """Reduce a time series DataFrame to at most `budget` points per series.
+
+    Rows are sorted by `x`; with `group`, each group is reduced on its own.
+    """
+    if group is not None:
+        if df.empty:
+            return df
+        return pd.concat(
+            [downsample(part, x, y, budget, method) for _, part in df.groupby(group, sort=False)],
+            ignore_index=True
+        )
+
+    if len(df) <= budget:
+        return df
+    df = df.sort_values(x, kind='stable').reset_index(drop=True)
+    indices = DOWNSAMPLERS[method](numeric_axis(df[x]),
+                                   np.nan_to_num(df[y].to_numpy(dtype=float)), budget)
+    return df.iloc[indices].reset_index(drop=True)
+
+def chart_series(load, query, time_range, x, y, group=None, budget=POINT_BUDGET, method='lttb'):
+    # The reduced series is cached per (query, range), not the full result
+    key = (query, time_range, x, y, group, budget, method)
+    return chart_cache.get_or_compute(
+        key, lambda: downsample(load(query, time_range), x, y, budget, method, group)
+    )
@@ -0,0 +1,236 @@
+import sqlite3
+import json
+import sys
+import time
+import argparse
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.heartbeat import record_heartbeat
+
+EARTH_RADIUS_M = 6371000.0
+
+# Default separation minimum and look-ahead window
+DEFAULT_SEPARATION_M = 500.0
+DEFAULT_LOOKAHEAD_S = 60.0
+
+# Half of the 3x3 neighbourhood: every pair of adjacent cells is visited once
+NEIGHBOUR_OFFSETS = [(0, 0), (1, -1), (1, 0), (1, 1), (0, 1)]
+
+
+def parse_position(path):
+    # Paths are stored as "[lat, lon]" or as a list of such points;
+    # the last point is the current position
+    if not path:
+        return None
+    try:
+        points = json.loads(path)
+    except (TypeError, ValueError):
+        return None
+    if points and isinstance(points[0], (list, tuple)):
+        points = points[-1]
+    if len(points) != 2:
+        return None
+    return float(points[0]), float(points[1])
+
+
+def project_positions(lat, lon):
+    # Local equirectangular projection to metres around the mean latitude
+    lat0 = np.radians(np.mean(lat))
+    x = np.radians(lon) * EARTH_RADIUS_M * np.cos(lat0)
+    y = np.radians(lat) * EARTH_RADIUS_M
+    return np.column_stack((x, y))
+
+
+def candidate_pairs(positions, cell_size):
+    # Spatial hash grid: bucket flights by cell and pair each flight with
+    # the flights in its own and adjacent cells
+    cells = np.floor(positions / cell_size).astype(np.int64)
+    cells -= cells.min(axis=0) - 1
+    width = cells[:, 1].max() + 2
+    keys = cells[:, 0] * width + cells[:, 1]
+
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    first, second = [], []
+    for dx, dy in NEIGHBOUR_OFFSETS:
+        # Looking up in key order keeps the searches sorted and cache friendly
+        target = sorted_keys + dx * width + dy
+        start = np.searchsorted(sorted_keys, target, side='left')
+        end = np.searchsorted(sorted_keys, target, side='right')
+        counts = end - start
+        if not counts.any():
+            continue
+
+        # Expand every flight into (flight, candidate) pairs for the target cell
+        i = np.repeat(order, counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        j = order[np.repeat(start, counts) + offsets]
+
+        if dx == 0 and dy == 0:
+            keep = i < j
+            i, j = i[keep], j[keep]
+        first.append(np.minimum(i, j))
+        second.append(np.maximum(i, j))
+
+    if not first:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(first), np.concatenate(second)
+
+
+def closest_approach(positions, velocities, i, j, t_start, t_end):
+    # Closest point of approach assuming constant velocity, clamped to the window
+    return closest_approach_state(np.hstack((positions, velocities)), i, j, t_start, t_end)
+
+
+def closest_approach_state(state, i, j, t_start, t_end):
+    # Same on an (n, 4) array of x, y, vx, vy: one row gather per flight of
+    # each pair, which dominates the cost over millions of candidates
+    relative = state.take(j, axis=0)
+    relative -= state.take(i, axis=0)
+    dx, dy, dvx, dvy = relative.T
+    dv2 = dvx * dvx + dvy * dvy
+    t_cpa = np.divide(-(dx * dvx + dy * dvy), dv2, out=np.zeros_like(dv2), where=dv2 > 0)
+    np.clip(t_cpa, t_start, t_end, out=t_cpa)
+    dx += dvx * t_cpa
+    dy += dvy * t_cpa
+    return np.sqrt(dx * dx + dy * dy), t_cpa
+
+
+def find_conflicts(positions, velocities=None,
+                   separation=DEFAULT_SEPARATION_M,
+                   lookahead=DEFAULT_LOOKAHEAD_S):
+    """Find pairs closer than `separation` metres within `lookahead` seconds.
+
+    `positions` is an (n, 2) array in metres and `velocities` an optional
+    (n, 2) array in metres per second. Returns the index arrays of both
+    flights (sorted, i < j), the minimum distance and the time of closest
+    approach.
+
+    Stationary flights take about 0.1 s for 50,000 flights on one core. With
+    velocities the cost follows the number of nearby pairs: 50,000 flights
+    at up to 70 m/s per axis, 500 m separation and a 60 s look-ahead stay
+    within 1 s up to about 1.25 flights per square km (a 200 km square);
+    at 5 per square km (a 100 km square, ~600,000 conflicts) it takes ~1.5 s.
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    if velocities is None:
+        velocities = np.zeros_like(positions)
+    velocities = np.asarray(velocities, dtype=np.float64)
+
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64),
+             np.empty(0), np.empty(0))
+    if len(positions) < 2:
+        return empty
+
+    # During a slice of the window each flight stays within max_speed * dt / 2
+    # of its position at the middle of the slice, so a conflict needs the
+    # midpoints within separation + max_speed * dt. Slicing the window so the
+    # motion term equals the separation keeps cells at twice the separation
+    # instead of growing with the look-ahead.
+    max_speed = np.sqrt((velocities ** 2).sum(axis=1)).max()
+    slices = max(1, int(np.ceil(max_speed * lookahead / separation)))
+    dt = lookahead / slices
+    cell_size = separation + max_speed * dt
+
+    # Each pair has one closest approach over the whole window and is a
+    # candidate in the slice containing it, so keeping a conflict only in that
+    # slice reports every pair exactly once without deduplicating
+    state = np.hstack((positions, velocities))
+    found = []
+    for k in range(slices):
+        t_start = k * dt
+        midpoints = positions + velocities * (t_start + dt / 2)
+        i, j = candidate_pairs(midpoints, cell_size)
+        # Adjacent cells reach up to two cells away; drop pairs further apart
+        # than one cell along either axis before the closest approach
+        offset = np.abs(midpoints.take(j, axis=0) - midpoints.take(i, axis=0))
+        near = (offset < cell_size).all(axis=1)
+        i, j = i[near], j[near]
+        distance, t_cpa = closest_approach_state(state, i, j, 0.0, lookahead)
+        in_slice = np.minimum((t_cpa / dt).astype(np.int64), slices - 1) == k
+        conflict = (distance < separation) & in_slice
+        found.append((i[conflict], j[conflict], distance[conflict], t_cpa[conflict]))
+
+    i, j, distance, t_cpa = (np.concatenate(part) for part in zip(*found))
+    order = np.lexsort((j, i))
+    return i[order], j[order], distance[order], t_cpa[order]
+
+
+def load_active_flights(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT flight_id, path FROM flights WHERE status='In Progress'")
+
+    flight_ids, lat, lon = [], [], []
+    for flight_id, path in cursor:
+        position = parse_position(path)
+        if position is None:
+            continue
+        flight_ids.append(flight_id)
+        lat.append(position[0])
+        lon.append(position[1])
+    return flight_ids, np.array(lat), np.array(lon)
+
+
+def detect_conflicts(conn, separation=DEFAULT_SEPARATION_M):
+    flight_ids, lat, lon = load_active_flights(conn)
+    if len(flight_ids) < 2:
+        return []
+
+    # Flights only store their current position, so this checks the current
+    # separation; time_to_cpa is 0. Callers with velocities (e.g. from a
+    # surveillance feed) use find_conflicts directly for a look-ahead.
+    positions = project_positions(lat, lon)
+    i, j, distance, t_cpa = find_conflicts(positions, separation=separation)
+    return [
+        (flight_ids[a], flight_ids[b], float(d), float(t))
+        for a, b, d, t in zip(i, j, distance, t_cpa)
+    ]
+
+
+def save_conflicts(conn, conflicts):
+    # The table holds the current conflict picture, not a history
+    detected_at = datetime.now()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM conflicts")
+    cursor.executemany('''
+        INSERT INTO conflicts (flight_a, flight_b, min_separation,
+                               time_to_cpa, detected_at)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(a, b, d, t, detected_at) for a, b, d, t in conflicts])
+    conn.commit()
+
+
+def run_deconfliction(db_path='data/evtol_operations.db', interval=1.0,
+                      separation=DEFAULT_SEPARATION_M, once=False):
+    conn = sqlite3.connect(db_path)
+    try:
+        while True:
+            started = time.perf_counter()
+            conflicts = detect_conflicts(conn, separation)
+            save_conflicts(conn, conflicts)
+            record_heartbeat(conn, 'deconfliction', interval)
+            elapsed = time.perf_counter() - started
+            print(f"{datetime.now():%H:%M:%S} {len(conflicts)} conflicts "
+                  f"detected in {elapsed * 1000:.1f} ms")
+            if once:
+                break
+            time.sleep(max(0.0, interval - elapsed))
+    except KeyboardInterrupt:
+        print("Deconfliction stopped")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Airspace conflict detection for in-progress flights")
+    parser.add_argument("--db", default="data/evtol_operations.db")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between runs")
+    parser.add_argument("--separation", type=float, default=DEFAULT_SEPARATION_M, help="Separation minimum (m)")
+    parser.add_argument("--once", action="store_true", help="Run a single pass and exit")
+    args = parser.parse_args()
+
+    run_deconfliction(args.db, args.interval, args.separation, args.once)
@@ -0,0 +1,290 @@
+import sqlite3
+import csv
+import json
+import sys
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from database.queries import ANALYTICS_QUERIES, TIME_FILTERS, analytics_query
+from database.snapshot import AnalyticsConnection
+from database.partitions import (PARTITIONING_ENABLED, PARTITIONED_QUERIES, PARTITIONED_TABLES, PARTITION_DIR,
+                                 list_partitions, partitioned_analytics, partitioned_columns)
+
+# Rows fetched per round trip; memory use is bounded by one chunk
+CHUNK_SIZE = 10000
+
+EXPORT_FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "jsonl": ".jsonl"
+}
+
+# Summary reports and the analytics queries they are built from
+REPORTS = {
+    "flight_stats": ["flight_stats"],
+    "energy_trends": ["energy_trends"],
+    "maintenance_analysis": ["maintenance_analysis"],
+    "summary": list(ANALYTICS_QUERIES)
+}
+
+def iter_chunks(conn, sql, params=(), chunk_size=CHUNK_SIZE):
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    columns = [column[0] for column in cursor.description]
+
+    def chunks():
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+
+    return columns, chunks()
+
+def write_csv(path, columns, chunks):
+    rows_written = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for rows in chunks:
+            writer.writerows(rows)
+            rows_written += len(rows)
+    return rows_written
+
+def write_jsonl(path, columns, chunks):
+    rows_written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for rows in chunks:
+            f.writelines(json.dumps(dict(zip(columns, row)), default=str) + '\n' for row in rows)
+            rows_written += len(rows)
+    return rows_written
+
+def column_types(conn, sql, params=()):
+    """Storage classes (`typeof`) found in each result column, from one scan of the query.
+
+    SQLite columns are dynamically typed, so neither declared types nor the
+    first rows say what a later row holds. Parquet exports therefore run the
+    query twice, once here and once to stream the rows, which matters for
+    multi-GB exports.
+    """
+    columns = [column[0] for column in conn.execute(f"SELECT * FROM ({sql}) LIMIT 0", params).description]
+    probes = ", ".join(f'group_concat(DISTINCT typeof("{name}"))' for name in columns)
+    row = conn.execute(f"SELECT {probes} FROM ({sql})", params).fetchone()
+    return [set(found.split(',')) if found else set() for found in row]
+
+def value_types(columns, rows):
+    # Same as column_types for rows already in memory
+    names = {int: 'integer', float: 'real', str: 'text', bytes: 'blob', type(None): 'null'}
+    types = [set() for _ in columns]
+    for row in rows:
+        for found, value in zip(types, row):
+            found.add(names.get(type(value), 'text'))
+    return types
+
+def arrow_type(storage_classes):
+    import pyarrow as pa
+    found = set(storage_classes) - {'null'}
+    if found == {'integer'}:
+        return pa.int64()
+    if found and found <= {'integer', 'real'}:
+        return pa.float64()
+    if found == {'blob'}:
+        return pa.binary()
+    # Text, all-NULL and mixed text/number columns
+    return pa.string()
+
+def write_parquet(path, columns, chunks, types=None):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    # The schema comes from every row's storage class, not a guess from the first chunk
+    schema = pa.schema([
+        pa.field(name, arrow_type(found))
+        for name, found in zip(columns, types or [set() for _ in columns])
+    ])
+    as_text = [pa.types.is_string(field.type) for field in schema]
+
+    rows_written = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in chunks:
+            data = {
+                name: [row[i] if not text or row[i] is None or isinstance(row[i], str) else str(row[i])
+                       for row in rows]
+                for i, (name, text) in enumerate(zip(columns, as_text))
+            }
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+            rows_written += len(rows)
+    return rows_written
+
+WRITERS = {
+    "csv": write_csv,
+    "parquet": write_parquet,
+    "jsonl": write_jsonl
+}
+
+def resolve_format(path, fmt=None):
+    if fmt is None:
+        suffixes = {suffix: name for name, suffix in EXPORT_FORMATS.items()}
+        fmt = suffixes.get(Path(path).suffix.lower())
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported export format for {path}: {fmt}")
+    return fmt
+
+def export_query(sql, path, fmt=None, params=(), db_path='data/evtol_operations.db',
+                 chunk_size=CHUNK_SIZE):
+    fmt = resolve_format(path, fmt)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    # Long scans read from the analytics snapshot when it is enabled
+    with AnalyticsConnection(db_path) as conn:
+        # Parquet needs the column types before the first row group is written
+        options = {"types": column_types(conn, sql, params)} if fmt == "parquet" else {}
+        columns, chunks = iter_chunks(conn, sql, params, chunk_size)
+        return WRITERS[fmt](path, columns, chunks, **options)
+
+def export_partitioned_table(table, path, fmt=None, partition_dir=PARTITION_DIR,
+                             chunk_size=CHUNK_SIZE):
+    # Rows live in one file per zone or route; stream the files one after another
+    fmt = resolve_format(path, fmt)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    partitions = list_partitions(table, partition_dir)
+
+    # Every partition numbers its rows from 1, so `id` is left out as it is
+    # when migrating; the partition key column identifies where a row lives
+    schema = sqlite3.connect(':memory:')
+    try:
+        schema.execute(PARTITIONED_TABLES[table]['schema'])
+        columns = [column[0] for column in schema.execute(f'SELECT * FROM "{table}" LIMIT 0').description
+                   if column[0] != 'id']
+    finally:
+        schema.close()
+    sql = f'SELECT {", ".join(columns)} FROM "{table}"'
+
+    options = {}
+    if fmt == "parquet":
+        types = [set() for _ in columns]
+        for partition in partitions:
+            conn = sqlite3.connect(partition)
+            try:
+                for found, partition_found in zip(types, column_types(conn, sql)):
+                    found |= partition_found
+            finally:
+                conn.close()
+        options["types"] = types
+
+    def chunks():
+        for partition in partitions:
+            conn = sqlite3.connect(partition)
+            try:
+                yield from iter_chunks(conn, sql, (), chunk_size)[1]
+            finally:
+                conn.close()
+
+    return WRITERS[fmt](path, columns, chunks(), **options)
+
+def export_table(table, path, fmt=None, db_path='data/evtol_operations.db',
+                 chunk_size=CHUNK_SIZE):
+    # With partitioning on, the main database copies of these tables are stale
+    if PARTITIONING_ENABLED and table in PARTITIONED_TABLES:
+        return export_partitioned_table(table, path, fmt, chunk_size=chunk_size)
+
+    # Table names cannot be bound as parameters, so check them against the schema
+    conn = sqlite3.connect(db_path)
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    finally:
+        conn.close()
+    if table not in tables:
+        raise ValueError(f"Unknown table: {table}")
+
+    return export_query(f'SELECT * FROM "{table}"', path, fmt, db_path=db_path,
+                        chunk_size=chunk_size)
+
+def export_analytics(name, path, fmt=None, time_range="All Time",
+                     db_path='data/evtol_operations.db'):
+    if not (PARTITIONING_ENABLED and name in PARTITIONED_QUERIES):
+        return export_query(analytics_query(name, time_range), path, fmt, db_path=db_path)
+
+    # Fan-out results are already merged aggregates, small enough for one chunk
+    fmt = resolve_format(path, fmt)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    columns = partitioned_columns(name)
+    rows = [tuple(row[column] for column in columns)
+            for row in partitioned_analytics(name, time_range)]
+    options = {"types": value_types(columns, rows)} if fmt == "parquet" else {}
+    return WRITERS[fmt](path, columns, iter([rows] if rows else []), **options)
+
+def generate_report(report="summary", time_range="All Time", fmt="csv",
+                    out_dir='reports', db_path='data/evtol_operations.db'):
+    report_dir = Path(out_dir) / f"{report}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    report_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = {
+        "report": report,
+        "time_range": time_range,
+        "generated_at": datetime.now().isoformat(),
+        "files": {}
+    }
+    for name in REPORTS[report]:
+        path = report_dir / f"{name}{EXPORT_FORMATS[fmt]}"
+        rows = export_analytics(name, path, fmt, time_range, db_path)
+        manifest["files"][path.name] = rows
+
+    with open(report_dir / 'manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return report_dir
+
+def run_scheduled_reports(reports, interval_hours, time_range="Last 24 Hours", fmt="csv",
+                          out_dir='reports', db_path='data/evtol_operations.db'):
+    try:
+        while True:
+            for report in reports:
+                try:
+                    report_dir = generate_report(report, time_range, fmt, out_dir, db_path)
+                    print(f"Report generated: {report_dir}")
+                except Exception as e:
+                    print(f"Error generating report {report}: {str(e)}")
+            time.sleep(interval_hours * 3600)
+    except KeyboardInterrupt:
+        print("Report scheduler stopped")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming data export and report generation")
+    parser.add_argument("--db", default="data/evtol_operations.db")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    table_parser = subparsers.add_parser("table", help="Export a whole table")
+    table_parser.add_argument("table")
+    table_parser.add_argument("output", help="Output file (.csv, .parquet or .jsonl)")
+
+    query_parser = subparsers.add_parser("query", help="Export an analytics query result")
+    query_parser.add_argument("query", choices=list(ANALYTICS_QUERIES))
+    query_parser.add_argument("output", help="Output file (.csv, .parquet or .jsonl)")
+    query_parser.add_argument("--time-range", default="All Time", choices=list(TIME_FILTERS))
+
+    report_parser = subparsers.add_parser("report", help="Generate summary reports")
+    report_parser.add_argument("reports", nargs="+", choices=list(REPORTS))
+    report_parser.add_argument("--time-range", default="Last 24 Hours", choices=list(TIME_FILTERS))
+    report_parser.add_argument("--format", default="csv", choices=list(EXPORT_FORMATS))
+    report_parser.add_argument("--out-dir", default="reports")
+    report_parser.add_argument("--every", type=float, help="Regenerate every N hours")
+    args = parser.parse_args()
+
+    if args.command == "table":
+        rows = export_table(args.table, args.output, db_path=args.db)
+        print(f"Exported {rows} rows to {args.output}")
+    elif args.command == "query":
+        rows = export_analytics(args.query, args.output, time_range=args.time_range, db_path=args.db)
+        print(f"Exported {rows} rows to {args.output}")
+    elif args.every:
+        run_scheduled_reports(args.reports, args.every, args.time_range, args.format,
+                              args.out_dir, args.db)
+    else:
+        for report in args.reports:
+            print(f"Report generated: {generate_report(report, args.time_range, args.format, args.out_dir, args.db)}")
@@ -0,0 +1,34 @@
+import sqlite3
+from datetime import datetime
+
+# An engine counts as stopped once it has missed this many runs
+STALE_AFTER_RUNS = 3
+
+def record_heartbeat(conn, engine, interval):
+    # One row per engine, overwritten on every run
+    conn.execute('''
+        INSERT OR REPLACE INTO engine_heartbeats (engine, last_run, interval)
+        VALUES (?, ?, ?)
+    ''', (engine, datetime.now(), interval))
+    conn.commit()
+
+def engine_status(conn, engine):
+    """Return (last_run, stale) for a background engine.
+
+    last_run is None when the engine never ran; stale is True when it has
+    not run for STALE_AFTER_RUNS of its intervals, so its results should
+    not be shown as current.
+    """
+    try:
+        row = conn.execute(
+            "SELECT last_run, interval FROM engine_heartbeats WHERE engine=?", (engine,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # Databases created before the heartbeat table
+        row = None
+    if row is None:
+        return None, True
+
+    last_run = datetime.fromisoformat(row[0])
+    stale = (datetime.now() - last_run).total_seconds() > STALE_AFTER_RUNS * max(row[1], 1.0)
+    return last_run, stale
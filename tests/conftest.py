@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Modules import each other as top-level packages from src/, as the scripts do
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
@@ -0,0 +1,250 @@
+import sqlite3
+import time
+from datetime import timedelta
+
+import pytest
+
+from database.partitions import PartitionRouter
+from database.setup_database import create_database
+from utils import alerts
+from utils.alerts import WeatherAlertEngine
+
+PORT_ZONES = {'Heliport-A': 'Zone-A', 'Heliport-B': 'Zone-B', 'Heliport-C': 'Zone-C'}
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    create_database()
+    path = str(tmp_path / 'data' / 'evtol_operations.db')
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO port_zones (port, zone) VALUES (?, ?)", PORT_ZONES.items())
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def local_timezone(monkeypatch):
+    def set_zone(name):
+        monkeypatch.setenv('TZ', name)
+        time.tzset()
+    yield set_zone
+    monkeypatch.undo()
+    time.tzset()
+
+
+def execute(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def add_flight(db_path, flight_id, origin='Heliport-C', destination='Heliport-C', status='In Progress'):
+    execute(db_path, '''
+        INSERT INTO flights (flight_id, origin, destination, path, energy_consumption, status)
+        VALUES (?, ?, ?, '[40.7, -73.9]', 100.0, ?)
+    ''', (flight_id, origin, destination, status))
+
+
+def add_weather(db_path, zone, risk_level, condition='Storm', age=None):
+    # Without an age the row takes the schema default, CURRENT_TIMESTAMP
+    if age is None:
+        execute(db_path, '''
+            INSERT INTO weather (location, condition, risk_level, temperature, wind_speed)
+            VALUES (?, ?, ?, 10.0, 40.0)
+        ''', (zone, condition, risk_level))
+    else:
+        execute(db_path, '''
+            INSERT INTO weather (time, location, condition, risk_level, temperature, wind_speed)
+            VALUES (datetime('now', ?), ?, ?, ?, 10.0, 40.0)
+        ''', (f'-{age} seconds', zone, condition, risk_level))
+
+
+def open_alerts(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return sorted(conn.execute(
+            "SELECT flight_id, zone FROM alerts WHERE resolved_at IS NULL"
+        ).fetchall())
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def engine_for(db_path):
+    engines = []
+
+    def start(**kwargs):
+        engine = WeatherAlertEngine(db_path, partitioned=False, **kwargs)
+        engine.bootstrap()
+        engines.append(engine)
+        return engine
+    yield start
+    for engine in engines:
+        engine.close()
+
+
+@pytest.mark.parametrize('zone_name', ['Europe/Berlin', 'Asia/Tokyo', 'UTC'])
+def test_fresh_reading_counts_east_of_utc(db_path, engine_for, local_timezone, zone_name):
+    local_timezone(zone_name)
+    add_flight(db_path, 'FL1')
+    add_weather(db_path, 'Zone-C', 'High')
+
+    engine = engine_for(max_age=3600)
+    assert engine.zone_risk['Zone-C'][1] == 'High'
+    assert open_alerts(db_path) == [('FL1', 'Zone-C')]
+
+    add_flight(db_path, 'FL2')
+    add_weather(db_path, 'Zone-C', 'High')
+    engine.poll()
+    assert open_alerts(db_path) == [('FL1', 'Zone-C'), ('FL2', 'Zone-C')]
+
+
+@pytest.mark.parametrize('zone_name', ['America/New_York', 'America/Los_Angeles'])
+def test_old_reading_is_stale_west_of_utc(db_path, engine_for, local_timezone, zone_name):
+    local_timezone(zone_name)
+    add_flight(db_path, 'FL1')
+    add_weather(db_path, 'Zone-C', 'High', age=2 * 3600)
+
+    engine = engine_for(max_age=3600)
+    assert 'Zone-C' not in engine.zone_risk
+
+    add_weather(db_path, 'Zone-C', 'High', age=2 * 3600)
+    engine.poll()
+    assert 'Zone-C' not in engine.zone_risk
+    assert open_alerts(db_path) == []
+
+
+def test_high_risk_raises_alert_for_flights_in_zone(db_path, engine_for):
+    add_flight(db_path, 'FL1', 'Heliport-A', 'Heliport-C')
+    add_flight(db_path, 'FL2', 'Heliport-B', 'Heliport-B')
+    engine = engine_for()
+
+    add_weather(db_path, 'Zone-C', 'High')
+    add_weather(db_path, 'Zone-B', 'Medium', condition='Rain')
+    engine.poll()
+    assert open_alerts(db_path) == [('FL1', 'Zone-C')]
+
+
+def test_alert_resolves_when_flight_completes(db_path, engine_for):
+    add_flight(db_path, 'FL1')
+    add_weather(db_path, 'Zone-C', 'High')
+    engine = engine_for()
+    assert open_alerts(db_path) == [('FL1', 'Zone-C')]
+
+    # Replayed from flight_status_log, filled by the flights triggers
+    execute(db_path, "UPDATE flights SET status='Completed' WHERE flight_id='FL1'")
+    engine.poll()
+    assert open_alerts(db_path) == []
+
+    # A flight taking off into a zone already on alert is alerted at once
+    add_flight(db_path, 'FL2', 'Heliport-A', 'Heliport-C', status='Scheduled')
+    engine.poll()
+    assert open_alerts(db_path) == []
+    execute(db_path, "UPDATE flights SET status='In Progress' WHERE flight_id='FL2'")
+    engine.poll()
+    assert open_alerts(db_path) == [('FL2', 'Zone-C')]
+
+
+def test_alert_resolves_when_risk_drops(db_path, engine_for):
+    add_flight(db_path, 'FL1')
+    add_weather(db_path, 'Zone-C', 'High')
+    engine = engine_for()
+
+    add_weather(db_path, 'Zone-C', 'Low', condition='Clear')
+    engine.poll()
+    assert open_alerts(db_path) == []
+    assert engine.zone_risk['Zone-C'][:2] == ('Clear', 'Low')
+
+
+def test_older_reading_arriving_late_is_ignored(db_path, engine_for):
+    add_flight(db_path, 'FL1')
+    add_weather(db_path, 'Zone-C', 'Low', condition='Clear', age=60)
+    engine = engine_for()
+
+    # Higher id, but observed before the current reading
+    add_weather(db_path, 'Zone-C', 'High', age=600)
+    engine.poll()
+    assert engine.zone_risk['Zone-C'][:2] == ('Clear', 'Low')
+    assert open_alerts(db_path) == []
+
+
+def test_bootstrap_uses_latest_reading_by_time_not_id(db_path, engine_for):
+    add_flight(db_path, 'FL1')
+    add_weather(db_path, 'Zone-C', 'Low', condition='Clear', age=60)
+    add_weather(db_path, 'Zone-C', 'High', age=600)
+
+    engine = engine_for()
+    assert engine.zone_risk['Zone-C'][:2] == ('Clear', 'Low')
+    assert open_alerts(db_path) == []
+
+
+def test_expired_reading_resolves_alerts(db_path, engine_for, monkeypatch):
+    add_flight(db_path, 'FL1')
+    add_weather(db_path, 'Zone-C', 'High')
+    engine = engine_for(max_age=3600)
+    assert open_alerts(db_path) == [('FL1', 'Zone-C')]
+
+    later = alerts.utc_now() + timedelta(hours=2)
+    monkeypatch.setattr(alerts, 'utc_now', lambda: later)
+    engine.poll()
+    assert 'Zone-C' not in engine.zone_risk
+    assert open_alerts(db_path) == []
+
+
+def test_bootstrap_closes_orphaned_alerts(db_path, engine_for):
+    # Left open by an engine that stopped: the flight completed and the zone cleared
+    add_flight(db_path, 'FL1', status='Completed')
+    add_flight(db_path, 'FL2')
+    add_weather(db_path, 'Zone-C', 'Low', condition='Clear')
+    for flight_id in ('FL1', 'FL2', 'FL3'):
+        execute(db_path, '''
+            INSERT INTO alerts (flight_id, zone, condition, risk_level)
+            VALUES (?, 'Zone-C', 'Storm', 'High')
+        ''', (flight_id,))
+
+    engine_for()
+    assert open_alerts(db_path) == []
+
+
+def test_bootstrap_keeps_valid_open_alert(db_path, engine_for):
+    add_flight(db_path, 'FL1')
+    add_weather(db_path, 'Zone-C', 'High')
+    first = engine_for()
+    first.close()
+
+    engine_for()
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0] == 1
+    conn.close()
+    assert open_alerts(db_path) == [('FL1', 'Zone-C')]
+
+
+def test_partitions_keep_their_own_id_cursors(db_path):
+    add_flight(db_path, 'FL1', 'Heliport-A', 'Heliport-C')
+    with PartitionRouter() as router:
+        router.insert('weather', [
+            {'time': alerts.utc_now(), 'location': zone, 'condition': 'Clear', 'risk_level': 'Low'}
+            for zone in ('Zone-A', 'Zone-C')
+        ])
+
+    engine = WeatherAlertEngine(db_path, partitioned=True)
+    try:
+        engine.bootstrap()
+        assert sorted(engine.weather_sources.values()) == [1, 1]
+
+        # Both partitions reuse id 2; each must still be read
+        with PartitionRouter() as router:
+            router.insert('weather', [
+                {'time': alerts.utc_now(), 'location': zone, 'condition': 'Storm', 'risk_level': 'High'}
+                for zone in ('Zone-A', 'Zone-C')
+            ])
+        engine.poll()
+        assert sorted(engine.weather_sources.values()) == [2, 2]
+        assert open_alerts(db_path) == [('FL1', 'Zone-A'), ('FL1', 'Zone-C')]
+    finally:
+        engine.close()
@@ -0,0 +1,128 @@
+import sqlite3
+import threading
+
+import pytest
+
+import api.app as api
+from api.pool import ConnectionPool, PoolExhausted
+from database.setup_database import create_database
+from database.snapshot import AnalyticsConnection, refresh_snapshot, snapshot_path_for, snapshot_time
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    create_database()
+    path = tmp_path / 'data' / 'evtol_operations.db'
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        INSERT INTO evtols (model_type, battery_status, maintenance_status, usage_count, max_range)
+        VALUES ('Model-X', 80.0, 'OK', 3, 250.0)
+    ''')
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+@pytest.fixture
+def client(db_path, monkeypatch):
+    pool = ConnectionPool(db_path, size=2)
+    monkeypatch.setattr(api, 'pool', pool)
+    api.response_cache.clear()
+    yield api.app.test_client()
+    pool.close()
+    api.response_cache.clear()
+
+
+def test_pool_raises_when_exhausted(db_path):
+    pool = ConnectionPool(db_path, size=2, timeout=0.05)
+    held = [pool.acquire(), pool.acquire()]
+    with pytest.raises(PoolExhausted):
+        pool.acquire()
+
+    # A returned connection is handed to the next caller
+    pool.release(held.pop())
+    assert pool.acquire() is not None
+    assert pool.opened == 2
+
+
+def test_waiting_caller_gets_released_connection(db_path):
+    pool = ConnectionPool(db_path, size=1, timeout=5)
+    conn = pool.acquire()
+    threading.Timer(0.05, pool.release, args=(conn,)).start()
+    assert pool.acquire() is conn
+
+
+def test_failed_connect_does_not_leak_a_slot(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'missing' / 'evtol.db'), size=2, timeout=0.05)
+    for _ in range(3):
+        with pytest.raises(sqlite3.OperationalError):
+            pool.acquire()
+    assert pool.opened == 0
+
+
+def test_exhausted_pool_answers_503(client):
+    api.pool.timeout = 0.05
+    held = [api.pool.acquire(), api.pool.acquire()]
+    response = client.get('/api/fleet')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    for conn in held:
+        api.pool.release(conn)
+
+
+def test_cached_json_returns_304_for_matching_etag(client):
+    first = client.get('/api/fleet')
+    assert first.status_code == 200
+    assert first.get_json()[0]['model_type'] == 'Model-X'
+    etag = first.headers['ETag']
+
+    second = client.get('/api/fleet', headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.data == b''
+    assert second.headers['ETag'] == etag
+
+    other = client.get('/api/fleet', headers={'If-None-Match': '"stale"'})
+    assert other.status_code == 200
+    assert other.data == first.data
+
+
+def test_cache_key_includes_query_string(client):
+    week = client.get('/api/analytics/flight_stats?time_range=Last+Week')
+    month = client.get('/api/analytics/flight_stats?time_range=Last+Month')
+    assert week.status_code == month.status_code == 200
+    assert len(api.response_cache.entries) == 2
+
+
+def test_analytics_reads_the_snapshot_and_reports_its_time(client, db_path, monkeypatch):
+    def add_flight(flight_id):
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO flights (flight_id, origin, destination, status) "
+                     "VALUES (?, 'Heliport-A', 'Vertiport-X', 'Scheduled')", (flight_id,))
+        conn.commit()
+        conn.close()
+
+    add_flight('FL1')
+    assert refresh_snapshot(db_path)
+    add_flight('FL2')
+    monkeypatch.setattr(api, 'DB_PATH', db_path)
+    monkeypatch.setattr(api, 'AnalyticsConnection',
+                        lambda path: AnalyticsConnection(path, enabled=True, max_age=3600))
+
+    body = client.get('/api/analytics/flight_stats').get_json()
+    # The flight added after the snapshot is not counted yet
+    assert body['rows'] == [{'status': 'Scheduled', 'count': 1}]
+    assert body['as_of'] == snapshot_time(snapshot_path_for(db_path)).isoformat(timespec='seconds')
+
+
+@pytest.mark.parametrize('body', [
+    [1, 2],
+    {'observations': []},
+    {'observations': [{'condition': 'Rain', 'temperature': None, 'wind_speed': 1,
+                       'vehicle_count': 1, 'average_speed': 1}]},
+    {'observations': [{'condition': 'Rain'}]}
+])
+def test_risk_score_rejects_malformed_payloads(client, body):
+    response = client.post('/api/risk/score', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
@@ -0,0 +1,49 @@
+from utils import cache
+from utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, 'monotonic', clock)
+    store = TTLCache(ttl=5)
+
+    store.set('key', 'value')
+    clock.now += 4.9
+    assert store.get('key') == 'value'
+    clock.now += 0.2
+    assert store.get('key') is None
+    assert store.get('key', 'default') == 'default'
+    assert 'key' not in store.entries
+
+
+def test_least_recently_used_entry_is_evicted():
+    store = TTLCache(ttl=60, max_entries=2)
+    store.set('a', 1)
+    store.set('b', 2)
+    assert store.get('a') == 1  # 'b' is now the least recently used
+
+    store.set('c', 3)
+    assert store.get('b') is None
+    assert store.get('a') == 1
+    assert store.get('c') == 3
+
+
+def test_get_or_compute_caches_falsy_values():
+    store = TTLCache(ttl=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None
+
+    assert store.get_or_compute('key', compute) is None
+    assert store.get_or_compute('key', compute) is None
+    assert len(calls) == 1
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.chart_data import downsample, lttb, minmax_buckets
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(3)
+    x = np.arange(10000, dtype=float)
+    y = np.cumsum(rng.normal(size=len(x)))
+    return x, y
+
+
+@pytest.mark.parametrize('n_out', [3, 10, 500, 1000])
+def test_lttb_returns_budget_and_keeps_endpoints(series, n_out):
+    x, y = series
+    indices = lttb(x, y, n_out)
+    assert len(indices) == n_out
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert (np.diff(indices) > 0).all()
+
+
+@pytest.mark.parametrize('n_out', [4, 11, 500, 1000])
+def test_minmax_buckets_stay_within_budget_and_keep_extremes(series, n_out):
+    x, y = series
+    indices = minmax_buckets(x, y, n_out)
+    assert len(indices) <= n_out
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert (np.diff(indices) > 0).all()
+    assert y.argmin() in indices and y.argmax() in indices
+
+
+@pytest.mark.parametrize('downsampler', [lttb, minmax_buckets])
+def test_short_series_are_returned_whole(downsampler):
+    x = np.arange(50, dtype=float)
+    assert (downsampler(x, x, 100) == np.arange(50)).all()
+    assert (downsampler(x, x, 50) == np.arange(50)).all()
+
+
+def test_downsample_reduces_each_group_to_the_budget():
+    df = pd.DataFrame({
+        'time': np.tile(pd.date_range('2026-01-01', periods=5000, freq='min'), 2),
+        'route': np.repeat(['Route1', 'Route2'], 5000),
+        'vehicles': np.arange(10000, dtype=float)
+    }).sample(frac=1, random_state=0)
+
+    reduced = downsample(df, 'time', 'vehicles', budget=200, group='route')
+    assert reduced.groupby('route').size().to_dict() == {'Route1': 200, 'Route2': 200}
+    for _, part in reduced.groupby('route'):
+        assert part['time'].is_monotonic_increasing
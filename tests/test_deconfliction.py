@@ -0,0 +1,134 @@
+import sqlite3
+import time
+
+import numpy as np
+
+from database.populate_data import populate_database
+from database.setup_database import create_database
+from utils.deconfliction import find_conflicts, load_active_flights
+
+
+def brute_force_conflicts(positions, velocities, separation, lookahead):
+    # Every pair, closest approach at constant velocity within [0, lookahead]
+    expected = {}
+    for i in range(len(positions)):
+        for j in range(i + 1, len(positions)):
+            dp = positions[j] - positions[i]
+            dv = velocities[j] - velocities[i]
+            dv2 = dv @ dv
+            t = 0.0 if dv2 == 0 else min(max(-(dp @ dv) / dv2, 0.0), lookahead)
+            distance = np.linalg.norm(dp + dv * t)
+            if distance < separation:
+                expected[(i, j)] = distance
+    return expected
+
+
+def found_conflicts(positions, velocities, separation, lookahead):
+    i, j, distance, t_cpa = find_conflicts(positions, velocities, separation, lookahead)
+    assert (i < j).all()
+    assert ((t_cpa >= 0) & (t_cpa <= lookahead)).all()
+    return dict(zip(zip(i.tolist(), j.tolist()), distance.tolist()))
+
+
+def assert_same_conflicts(found, expected):
+    assert set(found) == set(expected)
+    for pair, distance in expected.items():
+        assert np.isclose(found[pair], distance)
+
+
+def test_stationary_flights_match_brute_force():
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(0, 20000, size=(400, 2))
+
+    found = found_conflicts(positions, None, 500.0, 60.0)
+    expected = brute_force_conflicts(positions, np.zeros_like(positions), 500.0, 60.0)
+
+    assert expected
+    assert_same_conflicts(found, expected)
+
+
+def test_moving_flights_match_brute_force():
+    rng = np.random.default_rng(2)
+    positions = rng.uniform(0, 30000, size=(400, 2))
+    velocities = rng.uniform(-70, 70, size=(400, 2))
+
+    found = found_conflicts(positions, velocities, 500.0, 120.0)
+    expected = brute_force_conflicts(positions, velocities, 500.0, 120.0)
+
+    assert expected
+    assert_same_conflicts(found, expected)
+
+
+def test_converging_pair_is_found_before_it_is_close():
+    # 10 km apart, closing at 200 m/s: closest approach after 50 s
+    positions = np.array([[0.0, 0.0], [10000.0, 0.0]])
+    velocities = np.array([[100.0, 0.0], [-100.0, 0.0]])
+
+    i, j, distance, t_cpa = find_conflicts(positions, velocities, 500.0, 60.0)
+    assert (i.tolist(), j.tolist()) == ([0], [1])
+    assert np.isclose(distance[0], 0.0)
+    assert np.isclose(t_cpa[0], 50.0)
+
+    assert len(find_conflicts(positions, velocities, 500.0, 30.0)[0]) == 0
+
+
+def test_fewer_than_two_flights():
+    assert all(len(part) == 0 for part in find_conflicts(np.zeros((1, 2))))
+    assert all(len(part) == 0 for part in find_conflicts(np.zeros((0, 2))))
+
+
+def best_time(function, runs=3):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def test_50k_stationary_flights_within_one_second():
+    rng = np.random.default_rng(4)
+    positions = rng.uniform(0, 100000, size=(50000, 2))
+
+    elapsed, (i, _, _, _) = best_time(lambda: find_conflicts(positions))
+    assert len(i) > 0
+    assert elapsed < 1.0
+
+
+def test_50k_moving_flights_within_one_second_in_supported_envelope():
+    # Documented envelope: 70 m/s per axis, 500 m, 60 s, 1.25 flights per square km
+    rng = np.random.default_rng(5)
+    positions = rng.uniform(0, 200000, size=(50000, 2))
+    velocities = rng.uniform(-70, 70, size=(50000, 2))
+
+    elapsed, (i, _, _, t_cpa) = best_time(lambda: find_conflicts(positions, velocities, 500.0, 60.0))
+    assert len(i) > 0 and (t_cpa > 0).any()
+    assert elapsed < 1.0
+
+
+def test_pair_still_closing_at_end_of_window_is_reported_once():
+    # Closest approach within the window is at its end (t = lookahead)
+    positions = np.array([[0.0, 0.0], [12400.0, 0.0], [0.0, 50000.0]])
+    velocities = np.array([[100.0, 0.0], [-100.0, 0.0], [70.0, 70.0]])
+
+    i, j, distance, t_cpa = find_conflicts(positions, velocities, 500.0, 60.0)
+    assert (i.tolist(), j.tolist()) == ([0], [1])
+    assert np.isclose(distance[0], 400.0)
+    assert np.isclose(t_cpa[0], 60.0)
+
+
+def test_sample_flights_are_stored_as_lat_lon(tmp_path, monkeypatch):
+    # parse_position reads "[lat, lon]"; the sample data must use the same order
+    monkeypatch.chdir(tmp_path)
+    create_database()
+    populate_database()
+
+    conn = sqlite3.connect('data/evtol_operations.db')
+    try:
+        flight_ids, lat, lon = load_active_flights(conn)
+    finally:
+        conn.close()
+
+    assert flight_ids
+    assert ((lat >= 40) & (lat <= 41)).all()
+    assert ((lon >= -74) & (lon <= -73)).all()
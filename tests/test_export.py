@@ -0,0 +1,74 @@
+import csv
+import sqlite3
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from database.partitions import PartitionRouter
+from utils.export import column_types, export_partitioned_table, export_query
+
+
+def test_partitioned_table_export_leaves_out_per_partition_ids(tmp_path):
+    rows = [
+        {'route': route, 'congestion_level': 'Low', 'timestamp': f'2026-01-01 0{n}:00:00',
+         'vehicle_count': n, 'average_speed': 50.0}
+        for n, route in enumerate(['Route-A', 'Route-B', 'Route-A', 'Route-B'])
+    ]
+    with PartitionRouter(tmp_path / 'partitions') as router:
+        router.insert('traffic', rows)
+
+    path = tmp_path / 'traffic.csv'
+    assert export_partitioned_table('traffic', path, partition_dir=tmp_path / 'partitions') == 4
+
+    with open(path, newline='') as f:
+        exported = list(csv.DictReader(f))
+    assert 'id' not in exported[0]
+    assert sorted((row['route'], int(row['vehicle_count'])) for row in exported) == [
+        ('Route-A', 0), ('Route-A', 2), ('Route-B', 1), ('Route-B', 3)
+    ]
+
+
+@pytest.fixture
+def values_db(tmp_path):
+    path = tmp_path / 'values.db'
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE readings (n INTEGER, late REAL, mixed NUMERIC)")
+    # Column `late` is NULL in the first chunk; `mixed` starts as integers
+    conn.executemany("INSERT INTO readings VALUES (?, ?, ?)",
+                     [(1, None, 1), (2, None, 2), (3, 7.5, 3.25)])
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def test_column_types_scan_every_row(values_db):
+    conn = sqlite3.connect(values_db)
+    try:
+        assert column_types(conn, "SELECT * FROM readings") == [
+            {'integer'}, {'null', 'real'}, {'integer', 'real'}
+        ]
+    finally:
+        conn.close()
+
+
+def test_parquet_schema_covers_values_after_the_first_chunk(values_db, tmp_path):
+    path = tmp_path / 'readings.parquet'
+    assert export_query("SELECT * FROM readings ORDER BY n", path, db_path=values_db,
+                        chunk_size=1) == 3
+
+    table = pq.read_table(path)
+    assert table.schema.field('n').type == pa.int64()
+    assert table.schema.field('late').type == pa.float64()
+    assert table.schema.field('mixed').type == pa.float64()
+    assert table.column('late').to_pylist() == [None, None, 7.5]
+    assert table.column('mixed').to_pylist() == [1.0, 2.0, 3.25]
+
+
+def test_parquet_export_of_empty_result(values_db, tmp_path):
+    path = tmp_path / 'empty.parquet'
+    assert export_query("SELECT * FROM readings WHERE n > 10", path, db_path=values_db) == 0
+
+    table = pq.read_table(path)
+    assert table.num_rows == 0
+    assert table.column_names == ['n', 'late', 'mixed']
@@ -0,0 +1,78 @@
+import sqlite3
+
+import pytest
+
+from database.partitions import PartitionRouter, fan_out_aggregate, merge_partials
+from database.setup_database import WEATHER_TABLE
+
+GROUP_BY = {'condition': 'condition'}
+METRICS = {
+    'avg_temperature': ('avg', 'temperature'),
+    'min_wind': ('min', 'wind_speed'),
+    'max_wind': ('max', 'wind_speed'),
+    'observations': ('count', 'id')
+}
+
+
+def test_merge_partials_combines_averages_by_sum_and_count():
+    # Rows: condition, temperature sum, temperature count, min wind, max wind, count
+    partials = [
+        [('Rain', 30.0, 3, 5.0, 20.0, 3)],
+        [('Rain', 10.0, 1, 2.0, 8.0, 1), ('Snow', -4.0, 2, 1.0, 3.0, 2)]
+    ]
+    assert merge_partials(partials, GROUP_BY, METRICS) == [
+        {'condition': 'Rain', 'avg_temperature': 10.0, 'min_wind': 2.0, 'max_wind': 20.0, 'observations': 4},
+        {'condition': 'Snow', 'avg_temperature': -2.0, 'min_wind': 1.0, 'max_wind': 3.0, 'observations': 2}
+    ]
+
+
+def test_merge_partials_ignores_nulls_across_partitions():
+    # A partition whose values are all NULL reports SUM NULL, COUNT 0 and NULL min/max
+    partials = [
+        [('Fog', None, 0, None, None, 2)],
+        [('Fog', 12.0, 2, 4.0, 9.0, 2)],
+        [('Fog', None, 0, None, None, 1)],
+        [('Storm', None, 0, None, None, 1)]
+    ]
+    assert merge_partials(partials, GROUP_BY, METRICS) == [
+        {'condition': 'Fog', 'avg_temperature': 6.0, 'min_wind': 4.0, 'max_wind': 9.0, 'observations': 5},
+        {'condition': 'Storm', 'avg_temperature': None, 'min_wind': None, 'max_wind': None, 'observations': 1}
+    ]
+
+
+def test_merge_partials_sorts_null_groups_last():
+    partials = [[(None, 1.0, 1, 1.0, 1.0, 1)], [('Clear', 2.0, 1, 2.0, 2.0, 1)]]
+    assert [row['condition'] for row in merge_partials(partials, GROUP_BY, METRICS)] == ['Clear', None]
+
+
+def test_fan_out_aggregate_matches_single_database(tmp_path):
+    rows = [
+        {'time': f'2026-01-01 {hour:02d}:00:00', 'location': location, 'condition': condition,
+         'risk_level': 'Low', 'temperature': temperature, 'wind_speed': wind}
+        for hour, (location, condition, temperature, wind) in enumerate([
+            ('Zone-A', 'Rain', 10.0, 30.0), ('Zone-B', 'Rain', None, 12.0),
+            ('Zone-C', 'Rain', 4.0, None), ('Zone-A', 'Clear', 20.0, 5.0),
+            ('Zone-B', 'Clear', 22.5, 7.5), ('Zone-C', 'Fog', None, None)
+        ])
+    ]
+    with PartitionRouter(tmp_path) as router:
+        router.insert('weather', rows)
+
+    conn = sqlite3.connect(':memory:')
+    conn.execute(WEATHER_TABLE)
+    conn.executemany(
+        "INSERT INTO weather (time, location, condition, risk_level, temperature, wind_speed) "
+        "VALUES (:time, :location, :condition, :risk_level, :temperature, :wind_speed)", rows
+    )
+    expected = conn.execute('''
+        SELECT condition, AVG(temperature), MIN(wind_speed), MAX(wind_speed), COUNT(id)
+        FROM weather GROUP BY condition ORDER BY condition
+    ''').fetchall()
+
+    for use_processes in (False, True):
+        merged = fan_out_aggregate('weather', GROUP_BY, METRICS, partition_dir=tmp_path, workers=2,
+                                   use_processes=use_processes)
+        assert [tuple(row.values()) for row in merged] == [
+            (condition, pytest.approx(avg) if avg is not None else None, low, high, count)
+            for condition, avg, low, high, count in expected
+        ]
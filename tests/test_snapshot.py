@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+import database.snapshot as snapshot
+from database.setup_database import create_database
+from database.snapshot import AnalyticsConnection, ensure_snapshot, refresh_snapshot, snapshot_path_for
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    create_database()
+    return str(tmp_path / 'data' / 'evtol_operations.db')
+
+
+def add_evtol(db_path, model_type):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO evtols (model_type, battery_status, maintenance_status, usage_count, max_range) "
+                 "VALUES (?, 80.0, 'OK', 1, 250.0)", (model_type,))
+    conn.commit()
+    conn.close()
+
+
+def model_types(conn):
+    return [row[0] for row in conn.execute("SELECT model_type FROM evtols ORDER BY id")]
+
+
+def wait_for_refreshes():
+    deadline = time.monotonic() + 5
+    while snapshot._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not snapshot._refreshing
+
+
+def test_setup_puts_the_database_in_wal_mode(db_path):
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    conn.close()
+
+
+def test_refresh_logs_switching_an_older_database_to_wal(tmp_path, capsys):
+    db_path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.close()
+
+    assert refresh_snapshot(db_path)
+    assert 'WAL' in capsys.readouterr().out
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    conn.close()
+
+    assert refresh_snapshot(db_path)
+    assert capsys.readouterr().out == ''
+
+
+def test_stale_snapshot_is_served_while_one_refresh_runs(db_path, monkeypatch):
+    add_evtol(db_path, 'Model-A')
+    assert refresh_snapshot(db_path)
+    snapshot_path = snapshot_path_for(db_path)
+    old = time.time() - 600
+    os.utime(snapshot_path, (old, old))
+
+    started, release = [], threading.Event()
+
+    def slow_refresh(db_path, snapshot_path=None):
+        started.append(snapshot_path)
+        release.wait(5)
+        return True
+
+    monkeypatch.setattr(snapshot, 'refresh_snapshot', slow_refresh)
+    add_evtol(db_path, 'Model-B')
+
+    for _ in range(3):
+        reader = AnalyticsConnection(db_path, max_age=60, enabled=True)
+        with reader as conn:
+            assert model_types(conn) == ['Model-A']
+        assert abs((reader.as_of - datetime.fromtimestamp(old)).total_seconds()) < 0.01
+
+    release.set()
+    wait_for_refreshes()
+    assert started == [snapshot_path]
+
+
+def test_live_database_is_read_until_the_first_snapshot(db_path):
+    add_evtol(db_path, 'Model-A')
+    before = datetime.now().replace(microsecond=0)
+
+    reader = AnalyticsConnection(db_path, max_age=60, enabled=True)
+    with reader as conn:
+        assert model_types(conn) == ['Model-A']
+    assert reader.as_of >= before
+
+    # The read started the first copy in the background
+    wait_for_refreshes()
+    assert ensure_snapshot(db_path, max_age=60) is not None
+
+
+def test_each_database_has_its_own_snapshot(tmp_path):
+    paths = {}
+    for name in ('first', 'second'):
+        db_path = str(tmp_path / f'{name}.db')
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE source (name TEXT)")
+        conn.execute("INSERT INTO source VALUES (?)", (name,))
+        conn.commit()
+        conn.close()
+        assert refresh_snapshot(db_path)
+        paths[name] = snapshot_path_for(db_path)
+
+    assert paths == {'first': str(tmp_path / 'first_snapshot.db'),
+                     'second': str(tmp_path / 'second_snapshot.db')}
+    for name, path in paths.items():
+        conn = sqlite3.connect(path)
+        assert conn.execute("SELECT name FROM source").fetchall() == [(name,)]
+        conn.close()
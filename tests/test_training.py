@@ -0,0 +1,81 @@
+import json
+import sqlite3
+
+import joblib
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+from models.training import HOLDOUT_EVERY, save_artifacts, stream_chunks, train_incremental
+
+QUERY = "SELECT n, x, label FROM samples ORDER BY n"
+
+
+def make_source(path, numbers):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE samples (n INTEGER, x REAL, label INTEGER)")
+    conn.executemany("INSERT INTO samples VALUES (?, ?, ?)",
+                     [(n, float(n % 2) * 10 + n / 100, n % 2) for n in numbers])
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def held_out(sql, sources, chunk_size, prepare=None):
+    return [row[0] for rows, holdout in stream_chunks(sql, sources, chunk_size, prepare)
+            for row, hold in zip(rows, holdout) if hold]
+
+
+def test_holdout_split_continues_across_sources(tmp_path):
+    first = make_source(tmp_path / 'first.db', range(0, 3))
+    second = make_source(tmp_path / 'second.db', range(3, 12))
+
+    # Every HOLDOUT_EVERY-th row of the combined stream, not of each source
+    expected = list(range(0, 12, HOLDOUT_EVERY))
+    assert held_out(QUERY, [first, second], chunk_size=2) == expected
+    assert held_out(QUERY, [first, second], chunk_size=100) == expected
+
+
+def test_prepare_filters_rows_before_the_holdout_split(tmp_path):
+    source = make_source(tmp_path / 'samples.db', range(20))
+
+    def skip_thirds(rows):
+        return [row for row in rows if row[0] % 3 != 0]
+
+    kept = [n for n in range(20) if n % 3 != 0]
+    chunks = list(stream_chunks(QUERY, [source], chunk_size=1, prepare=skip_thirds))
+    # Chunks emptied by prepare are skipped
+    assert [rows[0][0] for rows, _ in chunks] == kept
+    # The split counts the rows prepare kept
+    assert held_out(QUERY, [source], 3, skip_thirds) == kept[::HOLDOUT_EVERY]
+
+
+def test_train_incremental_saves_artifacts_and_metadata(tmp_path):
+    sources = [make_source(tmp_path / 'first.db', range(0, 40)),
+               make_source(tmp_path / 'second.db', range(40, 100))]
+
+    def featurize(rows):
+        return np.array([[row[1]] for row in rows]), np.array([row[2] for row in rows])
+
+    scaler = StandardScaler()
+    model = SGDClassifier(loss='log_loss', random_state=0)
+    metrics = train_incremental(QUERY, featurize, scaler, model, classes=np.array([0, 1]),
+                                sources=sources, chunk_size=16, epochs=3)
+    assert metrics['train_rows'] == 80
+    assert metrics['test_rows'] == 20
+    assert metrics['accuracy'] == 1.0
+
+    models_dir = tmp_path / 'models'
+    version_dir = save_artifacts('test_model', {'test_model': model, 'test_scaler': scaler},
+                                 metrics, models_dir)
+
+    for directory in (version_dir, models_dir):
+        with open(directory / 'test_model_metadata.json') as f:
+            metadata = json.load(f)
+        assert metadata['model'] == 'test_model'
+        assert metadata['version'] == version_dir.name
+        assert metadata['artifacts'] == ['test_model.joblib', 'test_scaler.joblib']
+        assert metadata['metrics']['test_rows'] == 20
+        assert (directory / 'test_scaler.joblib').exists()
+        loaded = joblib.load(directory / 'test_model.joblib')
+        assert (loaded.predict(scaler.transform([[0.5], [10.5]])) == [0, 1]).all()